@@ -0,0 +1,222 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Blueprint, current_app, jsonify, request, abort
+from flask_login import current_user
+
+import archive
+import availability
+import counters
+import day_stats
+from models import Appointment, Consultant
+from schedule_cache import schedules
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+MAX_LIMIT = 200
+
+APPOINTMENT_FIELDS = {
+    'id': lambda a: a.id,
+    'appointment_number': lambda a: a.appointment_number,
+    'user_id': lambda a: a.user_id,
+    'name': lambda a: a.name,
+    'phone_number': lambda a: a.phone_number,
+    'age': lambda a: a.age,
+    'education': lambda a: a.education,
+    'national_id': lambda a: a.national_id,
+    'consultant_id': lambda a: a.consultant_id,
+    'consultant_name': lambda a: a.consultant.name,
+    'starts_at': lambda a: a.starts_at.strftime('%Y-%m-%dT%H:%M'),
+    'confirmed': lambda a: bool(a.confirmed),
+    'status': lambda a: a.status,
+}
+
+# نوبت‌های آرشیوشده رابطه consultant ندارند
+HISTORY_FIELDS = {name: serializer for name, serializer in APPOINTMENT_FIELDS.items() if name != 'consultant_name'}
+HISTORY_FIELDS['archived_at'] = lambda a: a.archived_at.strftime('%Y-%m-%dT%H:%M')
+
+CONSULTANT_FIELDS = {
+    'id': lambda c: c.id,
+    'name': lambda c: c.name,
+    'specialty': lambda c: c.specialty,
+    'time_start': lambda c: c.time_start,
+    'time_end': lambda c: c.time_end,
+    'days': lambda c: c.days.split(','),
+    'slot_minutes': lambda c: c.slot_minutes,
+}
+
+
+def _error(status, message):
+    response = jsonify(error=message)
+    response.status_code = status
+    abort(response)
+
+
+def admin_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated:
+            _error(401, 'authentication required')
+        if not current_user.is_admin:
+            _error(403, 'admin only')
+        return view(*args, **kwargs)
+    return wrapper
+
+
+# ETag از شمارنده نسخه جدول‌ها و آدرس درخواست ساخته می‌شود، نه از هش پاسخ؛
+# اگر If-None-Match برابر باشد پاسخ 304 بدون اجرای کوئری اصلی و serialize برمی‌گردد
+def etagged(*tables, per_minute=False, daily=False):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = counters.get(*tables)
+            if 'consultants' in versions:  # پاسخ‌هایی که از کش برنامه کاری مشاورها ساخته می‌شوند
+                versions['consultants'] = schedules.sync(versions['consultants'])
+            key = '|'.join(f'{name}={versions[name]}' for name in tables) + '|' + request.full_path
+            if per_minute:  # پاسخ به زمان فعلی هم وابسته است
+                key += datetime.now().strftime('|%Y-%m-%dT%H:%M')
+            elif daily:  # بازه پیش‌فرض از امروز شروع می‌شود
+                key += datetime.now().strftime('|%Y-%m-%d')
+            etag = hashlib.sha1(key.encode('utf-8')).hexdigest()[:24]
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = view(*args, **kwargs)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+def _selected_fields(available):
+    fields = request.args.get('fields')
+    if not fields:
+        return list(available)
+    selected = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in selected if field not in available]
+    if unknown:
+        _error(400, f"unknown fields: {', '.join(unknown)}")
+    return selected
+
+
+def _limit():
+    return max(1, min(request.args.get('limit', 50, type=int), MAX_LIMIT))
+
+
+def _date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        _error(400, f'{name} must be YYYY-MM-DD')
+
+
+# status=active (پیش‌فرض)، cancelled یا all
+def _status_arg():
+    status = request.args.get('status', 'active')
+    if status not in ('active', 'cancelled', 'all'):
+        _error(400, 'status must be active, cancelled or all')
+    return None if status == 'all' else status
+
+
+# جستجو با یکی از national_id، phone_number یا appointment_number (دقیق) یا name (پیشوند)
+def _search_arg():
+    given = [(field, request.args[field].strip()) for field in Appointment.SEARCH_FIELDS
+             if request.args.get(field, '').strip()]
+    if len(given) > 1:
+        _error(400, f"only one of {', '.join(Appointment.SEARCH_FIELDS)} may be given")
+    return given[0] if given else None
+
+
+# صفحه‌بندی keyset: یک ردیف اضافه خوانده می‌شود تا وجود صفحه بعد مشخص شود
+def _page(query, limit, fields, serializers):
+    rows = query.limit(limit + 1).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    items = [{field: serializers[field](row) for field in fields} for row in rows[:limit]]
+    return jsonify(items=items, next_cursor=next_cursor)
+
+
+@api.route('/appointments')
+@admin_required
+@etagged('appointments', 'consultants')
+def appointments():
+    fields = _selected_fields(APPOINTMENT_FIELDS)
+    confirmed = {'1': True, 'true': True, '0': False, 'false': False}.get(request.args.get('confirmed', ''))
+    date_to = _date_arg('to')
+    query = Appointment.listing(
+        consultant_id=request.args.get('consultant_id', type=int),
+        confirmed=confirmed,
+        starts_from=_date_arg('from'),
+        starts_before=date_to + timedelta(days=1) if date_to else None,
+        after=request.args.get('after', type=int),
+        status=_status_arg(),
+        search=_search_arg(),
+    )
+    return _page(query, _limit(), fields, APPOINTMENT_FIELDS)
+
+
+# تاریخچه نوبت‌های آرشیوشده (قدیمی‌تر از افق آرشیو)؛ نوبت‌های جاری از /appointments خوانده می‌شوند
+@api.route('/appointments/history')
+@admin_required
+@etagged('appointments')
+def appointment_history():
+    fields = _selected_fields(HISTORY_FIELDS)
+    date_to = _date_arg('to')
+    query = archive.history(
+        consultant_id=request.args.get('consultant_id', type=int),
+        user_id=request.args.get('user_id', type=int),
+        starts_from=_date_arg('from'),
+        starts_before=date_to + timedelta(days=1) if date_to else None,
+        after=request.args.get('after', type=int),
+    )
+    return _page(query, _limit(), fields, HISTORY_FIELDS)
+
+
+@api.route('/consultants')
+@etagged('consultants')
+def consultants():
+    fields = _selected_fields(CONSULTANT_FIELDS)
+    query = Consultant.query.filter_by(deleted_at=None).order_by(Consultant.id)
+    after = request.args.get('after', type=int)
+    if after:
+        query = query.filter(Consultant.id > after)
+    return _page(query, _limit(), fields, CONSULTANT_FIELDS)
+
+
+@api.route('/consultants/<int:consultant_id>/availability')
+@etagged('appointments', 'consultants', per_minute=True)
+def consultant_availability(consultant_id):
+    schedule = schedules.get(consultant_id)
+    if not schedule:
+        _error(404, 'consultant not found')
+    start = _date_arg('from') or datetime.now()
+    end = _date_arg('to') or start + timedelta(days=7)
+    if not 0 < (end.date() - start.date()).days <= availability.MAX_RANGE_DAYS:
+        _error(400, 'invalid range')
+    slots = availability.free_slots(schedule, start.date(), end.date(), now=datetime.now())
+    return jsonify(consultant_id=schedule.id, slot_minutes=schedule.slot_length.seconds // 60,
+                   slots=[slot.strftime('%Y-%m-%dT%H:%M') for slot in slots])
+
+
+
+# آمار روزانه مشاورها فقط از جدول consultant_day_stats
+@api.route('/stats')
+@admin_required
+@etagged('appointments', 'consultants', daily=True)
+def stats():
+    start = _date_arg('from') or datetime.now()
+    end = _date_arg('to') or start + timedelta(days=6)
+    if not 0 <= (end.date() - start.date()).days < day_stats.MAX_RANGE_DAYS:
+        _error(400, 'invalid range')
+    days, report = day_stats.dashboard(start.date(), end.date(), request.args.get('consultant_id', type=int))
+    items = [{
+        'consultant_id': item['consultant'].id,
+        'consultant_name': item['consultant'].name,
+        'totals': item['totals'],
+        'days': [dict(cell, day=cell['day'].isoformat()) for cell in item['days']],
+    } for item in report]
+    return jsonify({'from': days[0].isoformat(), 'to': days[-1].isoformat(), 'items': items})
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import counters
+from models import db, Appointment, ArchivedAppointment
+
+# ستون‌های مشترک دو جدول به همان ترتیب
+COLUMNS = ['id', 'user_id', 'name', 'phone_number', 'age', 'education', 'national_id', 'consultant_id',
+           'starts_at', 'slot_start', 'confirmed', 'appointment_number', 'status', 'cancelled_at']
+
+
+# انتقال یک دسته از نوبت‌های قدیمی‌تر از cutoff: INSERT ... SELECT و DELETE با همان idها در یک تراکنش؛
+# تعداد ردیف منتقل‌شده برمی‌گردد و صفر یعنی کار تمام است.
+# cutoff بعد از اکنون نوبت‌های آینده و فعال را هم آرشیو می‌کرد، پس پذیرفته نمی‌شود
+def archive_batch(cutoff, batch_size):
+    if cutoff > datetime.now():
+        raise ValueError('cutoff آرشیو نباید بعد از زمان فعلی باشد')
+    ids = db.session.scalars(
+        db.select(Appointment.id).where(Appointment.starts_at < cutoff)
+        .order_by(Appointment.id).limit(batch_size)
+    ).all()
+    if not ids:
+        db.session.rollback()
+        return 0
+    db.session.execute(db.insert(ArchivedAppointment).from_select(
+        COLUMNS + ['archived_at'],
+        db.select(*[getattr(Appointment, column) for column in COLUMNS],
+                  db.literal(datetime.now(), db.DateTime)).where(Appointment.id.in_(ids))
+    ))
+    db.session.execute(db.delete(Appointment).where(Appointment.id.in_(ids))
+                       .execution_options(synchronize_session=False))
+    counters.bump('appointments')
+    db.session.commit()
+    return len(ids)
+
+
+# تاریخچه: فقط از جدول آرشیو با صفحه‌بندی keyset روی id
+def history(consultant_id=None, user_id=None, starts_from=None, starts_before=None, after=None):
+    query = ArchivedAppointment.query
+    if consultant_id:
+        query = query.filter(ArchivedAppointment.consultant_id == consultant_id)
+    if user_id:
+        query = query.filter(ArchivedAppointment.user_id == user_id)
+    if starts_from:
+        query = query.filter(ArchivedAppointment.starts_at >= starts_from)
+    if starts_before:
+        query = query.filter(ArchivedAppointment.starts_at < starts_before)
+    if after:
+        query = query.filter(ArchivedAppointment.id > after)
+    return query.order_by(ArchivedAppointment.id)
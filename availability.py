@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from models import db, Appointment
+
+# حداکثر بازه‌ای که در یک درخواست محاسبه می‌شود
+MAX_RANGE_DAYS = 31
+
+
+# اسلات‌های آزاد یک مشاور در بازه [start_day, end_day)
+# با یک کوئری روی ایندکس (consultant_id, slot_start) و محاسبه تداخل در حافظه
+def free_slots(schedule, start_day, end_day, now=None):
+    start = datetime.combine(start_day, datetime.min.time())
+    end = datetime.combine(end_day, datetime.min.time())
+    booked = db.session.scalars(
+        db.select(Appointment.slot_start)
+        .where(Appointment.consultant_id == schedule.id,
+               Appointment.slot_start >= start - schedule.slot_length,
+               Appointment.slot_start < end)
+        .order_by(Appointment.slot_start)
+    ).all()
+
+    free = []
+    i = 0
+    day = start_day
+    while day < end_day:
+        for slot in schedule.slots_on(day):
+            # نوبت‌هایی که قبل از این اسلات تمام شده‌اند دیگر لازم نیستند
+            while i < len(booked) and booked[i] + schedule.slot_length <= slot:
+                i += 1
+            if i < len(booked) and booked[i] < slot + schedule.slot_length:
+                continue
+            if now is not None and slot < now:
+                continue
+            free.append(slot)
+        day += timedelta(days=1)
+    return free
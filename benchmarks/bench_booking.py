@@ -0,0 +1,212 @@
+# بنچمارک تکرارپذیر مسیرهای اصلی برنامه روی SQLite (پروفایل testing)
+#
+#   python benchmarks/bench_booking.py --appointments 1000 10000 100000 1000000 --output results.json
+#
+# برای هر اندازه دیتابیس از نو ساخته و seed می‌شود؛ برای هر endpoint زمان پاسخ
+# (p50/p95/p99)، تعداد درخواست در ثانیه و تعداد کوئری SQL هر درخواست گزارش می‌شود.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('APP_CONFIG', 'testing')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from models import db, User, Consultant, Appointment, Counter  # noqa: E402
+from numbering import appointment_numbers, FIRST_NUMBER  # noqa: E402
+from page_cache import pages  # noqa: E402
+from passwords import hasher  # noqa: E402
+from schedule_cache import schedules, WEEKDAYS  # noqa: E402
+from user_cache import users  # noqa: E402
+
+SEED_BATCH = 10000
+SLOT_MINUTES = 30
+PASSWORD = 'bench-password'
+
+
+def seed(consultant_count, appointment_count):
+    db.drop_all()
+    db.create_all()
+    password = hasher.hash(PASSWORD)
+    db.session.add_all([
+        User(id=1, username='admin', password=password, is_admin=True),
+        User(id=2, username='patient', password=password, is_admin=False),
+    ])
+    db.session.execute(db.insert(Consultant), [
+        {'id': i + 1, 'name': f'consultant-{i + 1}', 'specialty': 'general', 'time_start': '00:00',
+         'time_end': '23:59', 'days': ','.join(WEEKDAYS), 'slot_minutes': SLOT_MINUTES}
+        for i in range(consultant_count)
+    ])
+
+    # نوبت‌ها حول امروز پخش می‌شوند تا صفحه نوبت‌های امروز هم داده واقعی داشته باشد
+    per_consultant = appointment_count // consultant_count + 1
+    first_slot = datetime.combine(datetime.now().date(), datetime.min.time()) - timedelta(
+        minutes=SLOT_MINUTES * (per_consultant // 2))
+    for start in range(0, appointment_count, SEED_BATCH):
+        rows = []
+        for i in range(start, min(start + SEED_BATCH, appointment_count)):
+            slot = first_slot + timedelta(minutes=SLOT_MINUTES * (i // consultant_count))
+            rows.append({
+                'user_id': 2 if i % 1000 == 0 else None,
+                'name': f'patient {i}',
+                'phone_number': f'09{i:09d}'[:11],
+                'age': 20 + i % 60,
+                'education': 'کارشناسی',
+                'national_id': f'{i:010d}',
+                'consultant_id': i % consultant_count + 1,
+                'starts_at': slot,
+                'slot_start': slot,
+                'confirmed': i % 3 == 0,
+                'appointment_number': str(FIRST_NUMBER + i),
+            })
+        db.session.execute(db.insert(Appointment), rows)
+    db.session.add_all([
+        Counter(name='appointment_number', value=FIRST_NUMBER + appointment_count - 1),
+        Counter(name='appointments', value=0),
+        Counter(name='consultants', value=0),
+    ])
+    db.session.commit()
+    schedules.invalidate()
+    users.clear()
+    pages.clear()
+    appointment_numbers.reset()
+
+
+# اسلات‌های آینده که در داده seed شده رزرو نشده‌اند
+def future_slots(consultant_count):
+    day = datetime.now().date() + timedelta(days=365 * 50)
+    while True:
+        slot = datetime.combine(day, datetime.min.time())
+        for _ in range(24 * 60 // SLOT_MINUTES - 1):
+            for consultant in range(1, consultant_count + 1):
+                yield consultant, slot
+            slot += timedelta(minutes=SLOT_MINUTES)
+        day += timedelta(days=1)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(name, call, requests, warmup):
+    for _ in range(warmup):
+        call()
+    latencies, queries = [], []
+    started = time.perf_counter()
+    for _ in range(requests):
+        request_started = time.perf_counter()
+        response = call()
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{name}: HTTP {response.status_code}')
+        queries.append(int(response.headers.get('X-Query-Count', 0)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': requests,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'requests_per_second': round(requests / elapsed, 2),
+        'sql_per_request': round(sum(queries) / len(queries), 2),
+        'sql_max': max(queries),
+    }
+
+
+# درخواست بدون کش صفحه اجرا می‌شود تا هزینه واقعی کوئری و رندر اندازه گرفته شود
+def without_page_cache(call):
+    def uncached():
+        backend, pages.backend = pages.backend, None
+        try:
+            return call()
+        finally:
+            pages.backend = backend
+    return uncached
+
+
+def run(consultant_count, requests, warmup):
+    slots = future_slots(consultant_count)
+
+    def book():
+        consultant, slot = next(slots)
+        return client.post('/book', data={
+            'name': 'bench', 'phone_number': '09120000000', 'age': '30', 'education': 'کارشناسی',
+            'national_id': '0000000000', 'consultant': f'consultant-{consultant}',
+            'date': slot.strftime('%Y-%m-%dT%H:%M'),
+        })
+
+    client = app.test_client()
+    admin = app.test_client()
+    admin.post('/login', data={'username': 'admin', 'password': PASSWORD})
+    patient = app.test_client()
+    patient.post('/login', data={'username': 'patient', 'password': PASSWORD})
+
+    scenarios = {
+        'POST /book': book,
+        'GET /admin_panel': lambda: admin.get('/admin_panel'),
+        'GET /today_appointments': without_page_cache(lambda: client.get('/today_appointments')),
+        'GET /today_appointments hit': lambda: client.get('/today_appointments'),
+        'GET /profile': lambda: patient.get('/profile'),
+        'POST /login': lambda: app.test_client().post('/login', data={'username': 'patient', 'password': PASSWORD}),
+    }
+    return {name: measure(name, call, requests, warmup) for name, call in scenarios.items()}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='booking flow benchmark on SQLite')
+    parser.add_argument('--consultants', type=int, default=20)
+    parser.add_argument('--appointments', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--requests', type=int, default=200, help='measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--output', metavar='PATH', help='write results as JSON')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'database': app.config['SQLALCHEMY_DATABASE_URI'],
+            'bcrypt_rounds': hasher.rounds,
+            'consultants': args.consultants,
+            'requests': args.requests,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'runs': [],
+    }
+    for appointment_count in args.appointments:
+        seed_started = time.perf_counter()
+        with app.app_context():
+            seed(args.consultants, appointment_count)
+        seed_seconds = time.perf_counter() - seed_started
+        # درخواست‌ها بیرون از app context اجرا می‌شوند تا هر کدام session و g جدا داشته باشند
+        results = run(args.consultants, args.requests, args.warmup)
+        report['runs'].append({'appointments': appointment_count, 'seed_seconds': round(seed_seconds, 2),
+                               'endpoints': results})
+
+        print(f'\n{appointment_count} appointments (seeded in {seed_seconds:.1f}s)')
+        print(f"{'endpoint':<30}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'sql/req':>9}")
+        for name, result in results.items():
+            print(f"{name:<30}{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}"
+                  f"{result['requests_per_second']:>9}{result['sql_per_request']:>9}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# بنچمارک جستجوی نوبت‌ها (کد ملی، تلفن، شماره نوبت، پیشوند نام و پروفایل کاربر) روی SQLite
+#
+#   python benchmarks/bench_lookup.py --appointments 1000 10000 100000 1000000 --output lookup.json
+#
+# هدف: زمان هر جستجو با بزرگ شدن جدول appointments تقریباً ثابت بماند. برای هر کوئری
+# طرح اجرای SQLite (EXPLAIN QUERY PLAN) هم گزارش می‌شود تا استفاده از ایندکس دیده شود.
+import argparse
+import json
+import platform
+import random
+import time
+from datetime import datetime
+
+from bench_booking import app, seed, measure, git_commit, PASSWORD
+from models import db, Appointment
+
+LOOKUPS = ('national_id', 'phone_number', 'appointment_number', 'name')
+
+
+# مقدار جستجو برای ردیف i با همان الگوی seed
+def lookup_value(field, i):
+    return {
+        'national_id': f'{i:010d}',
+        'phone_number': f'09{i:09d}'[:11],
+        'appointment_number': str(10000 + i),
+        'name': f'patient {i}',  # پیشوند: «patient 123» ردیف‌های 123، 1230، ... را هم می‌گیرد
+    }[field]
+
+
+# seed به هر هزار نوبت یکی را به بیمار می‌دهد؛ اینجا تعداد نوبت‌های بیمار ثابت نگه داشته می‌شود
+# تا زمان پروفایل فقط هزینه جستجو را نشان دهد نه اندازه خروجی
+def limit_patient_rows(keep=10):
+    ids = db.session.scalars(db.select(Appointment.id).where(Appointment.user_id == 2).order_by(Appointment.id)).all()
+    keep_ids = ids[::max(1, len(ids) // keep)][:keep]
+    db.session.execute(db.update(Appointment).where(Appointment.user_id == 2, Appointment.id.not_in(keep_ids))
+                       .values(user_id=None))
+    db.session.commit()
+
+
+def query_plans(appointment_count):
+    plans = {}
+    with app.app_context():
+        for field in LOOKUPS:
+            query = Appointment.listing(search=(field, lookup_value(field, appointment_count // 2))).limit(51)
+            compiled = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+            rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {compiled}')).all()
+            plans[field] = [row[-1] for row in rows]
+    return plans
+
+
+def run(appointment_count, requests, warmup):
+    admin = app.test_client()
+    admin.post('/login', data={'username': 'admin', 'password': PASSWORD})
+    patient = app.test_client()
+    patient.post('/login', data={'username': 'patient', 'password': PASSWORD})
+    rng = random.Random(appointment_count)
+
+    def search(field):
+        def call():
+            value = lookup_value(field, rng.randrange(appointment_count))
+            return admin.get('/api/v1/appointments', query_string={field: value, 'status': 'all'})
+        return call
+
+    scenarios = {f'search {field}': search(field) for field in LOOKUPS}
+    scenarios['GET /profile'] = lambda: patient.get('/profile')
+    return {name: measure(name, call, requests, warmup) for name, call in scenarios.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='appointment lookup benchmark on SQLite')
+    parser.add_argument('--consultants', type=int, default=20)
+    parser.add_argument('--appointments', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--requests', type=int, default=300, help='measured requests per lookup')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--output', metavar='PATH', help='write results as JSON')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'database': app.config['SQLALCHEMY_DATABASE_URI'],
+            'consultants': args.consultants,
+            'requests': args.requests,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'runs': [],
+    }
+    for appointment_count in args.appointments:
+        seed_started = time.perf_counter()
+        with app.app_context():
+            seed(args.consultants, appointment_count)
+            limit_patient_rows()
+        seed_seconds = time.perf_counter() - seed_started
+        results = run(appointment_count, args.requests, args.warmup)
+        plans = query_plans(appointment_count)
+        report['runs'].append({'appointments': appointment_count, 'seed_seconds': round(seed_seconds, 2),
+                               'lookups': results, 'query_plans': plans})
+
+        print(f'\n{appointment_count} appointments (seeded in {seed_seconds:.1f}s)')
+        print(f"{'lookup':<26}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'sql/req':>9}")
+        for name, result in results.items():
+            print(f"{name:<26}{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}"
+                  f"{result['requests_per_second']:>9}{result['sql_per_request']:>9}")
+        for field, plan in plans.items():
+            print(f'  plan {field}: {"; ".join(plan)}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# بنچمارک توان عملیاتی ورود (بررسی رمز bcrypt) برای costها و اندازه‌های مختلف pool
+#
+#   python benchmarks/bench_passwords.py --rounds 10 11 12 --pool-sizes 1 2 4 8 --logins 64
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passwords import PasswordHasher  # noqa: E402
+
+
+def run(rounds, pool_size, logins, clients):
+    hasher = PasswordHasher(rounds=rounds, pool_size=pool_size, queue_timeout=600)
+    hashed = hasher.hash('secret-password')
+    # هر client مثل یک thread درخواست وب ورود را شبیه‌سازی می‌کند
+    def login(_):
+        started = time.perf_counter()
+        if not hasher.verify('secret-password', hashed):
+            raise RuntimeError('password verification failed')
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=clients) as requests:
+        started = time.perf_counter()
+        latencies = list(requests.map(login, range(logins)))
+        elapsed = time.perf_counter() - started
+    return {
+        'rounds': rounds,
+        'pool_size': pool_size,
+        'clients': clients,
+        'logins': logins,
+        'seconds': round(elapsed, 3),
+        'logins_per_second': round(logins / elapsed, 2),
+        'mean_ms': round(sum(latencies) / logins * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='login throughput by bcrypt cost and pool size')
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12])
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--clients', type=int, default=16, help='concurrent request threads')
+    parser.add_argument('--output', metavar='PATH', help='write results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rounds':>6} {'pool':>5} {'logins/s':>10} {'mean ms':>9}")
+    for rounds in args.rounds:
+        for pool_size in args.pool_sizes:
+            result = run(rounds, pool_size, args.logins, args.clients)
+            results.append(result)
+            print(f"{rounds:>6} {pool_size:>5} {result['logins_per_second']:>10} {result['mean_ms']:>9}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from schedule_cache import schedules, WEEKDAYS
+
+VALID_EDUCATIONS = ['دیپلم', 'کاردانی', 'کارشناسی', 'کارشناسی ارشد', 'دکتری']
+
+
+class BookingError(ValueError):
+    pass
+
+
+# قوانین اعتبارسنجی مشترک بین فرم رزرو و import گروهی
+# خروجی: فیلدهای Appointment (بدون user_id و شماره نوبت)
+def validate_booking(data):
+    name = str(data.get('name') or '')
+    phone_number = str(data.get('phone_number') or '')
+    age = data.get('age')
+    education = str(data.get('education') or '')
+    national_id = str(data.get('national_id') or '')
+    consultant_name = str(data.get('consultant') or '')
+    date = str(data.get('date') or '')
+
+    # اعتبارسنجی نام (حداقل 2 کاراکتر)
+    if len(name.strip()) < 2:
+        raise BookingError('نام باید حداقل 2 کاراکتر باشد.')
+
+    # اعتبارسنجی شماره تماس
+    if not phone_number.startswith('09') or len(phone_number) != 11 or not phone_number.isdigit():
+        raise BookingError('شماره تماس باید 11 رقمی باشد و با 09 شروع شود.')
+
+    # اعتبارسنجی کد ملی
+    if len(national_id) != 10 or not national_id.isdigit():
+        raise BookingError('کد ملی باید 10 رقمی باشد.')
+
+    # اعتبارسنجی سن
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        raise BookingError('سن باید یک عدد باشد.')
+    if age < 1 or age > 120:
+        raise BookingError('سن باید بین 1 تا 120 باشد.')
+
+    # اعتبارسنجی تحصیلات
+    if education not in VALID_EDUCATIONS:
+        raise BookingError('تحصیلات انتخاب‌شده معتبر نیست.')
+
+    # اعتبارسنجی مشاور
+    consultant = schedules.by_name(consultant_name)
+    if not consultant:
+        raise BookingError('مشاور انتخاب‌شده پیدا نشد.')
+
+    # اعتبارسنجی تاریخ و زمان
+    try:
+        appointment_date = datetime.strptime(date, '%Y-%m-%dT%H:%M')
+    except ValueError:
+        raise BookingError('تاریخ و زمان واردشده معتبر نیست.')
+
+    # چک کردن روز هفته
+    if not consultant.works_on(appointment_date.weekday()):
+        appointment_day = WEEKDAYS[appointment_date.weekday()]
+        raise BookingError(f'مشاور در روز {appointment_day} کار نمی‌کند. روزهای کاری: {consultant.days}')
+
+    # چک کردن بازه زمانی
+    if not consultant.within_hours(appointment_date.time()):
+        raise BookingError(f'زمان انتخاب‌شده خارج از بازه کاری مشاور است ({consultant.time_start:%H:%M} تا {consultant.time_end:%H:%M}).')
+
+    # چک کردن شروع اسلات
+    if not consultant.is_slot_start(appointment_date):
+        raise BookingError(f'زمان انتخاب‌شده باید شروع یکی از اسلات‌های {consultant.slot_length.seconds // 60} دقیقه‌ای مشاور باشد.')
+
+    return {
+        'name': name,
+        'phone_number': phone_number,
+        'age': age,
+        'education': education,
+        'national_id': national_id,
+        'consultant_id': consultant.id,
+        'starts_at': appointment_date,
+        'slot_start': appointment_date,
+    }
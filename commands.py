@@ -0,0 +1,243 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy.exc import IntegrityError
+
+import counters
+import archive
+import day_stats
+import notifications
+from booking import validate_booking, BookingError
+from day_stats import StatsDelta
+from models import db, Appointment, Consultant
+from numbering import appointment_numbers
+
+appointments_cli = AppGroup('appointments', help='ورود و خروج گروهی نوبت‌ها')
+notifications_cli = AppGroup('notifications', help='ارسال پیامک‌های صف outbox')
+
+EXPORT_FIELDS = ['appointment_number', 'name', 'phone_number', 'age', 'education', 'national_id',
+                 'consultant', 'date', 'confirmed', 'status']
+
+
+def _detect_format(filename, fmt):
+    if fmt:
+        return fmt
+    return 'jsonl' if os.path.splitext(filename)[1] in ('.jsonl', '.json') else 'csv'
+
+
+# خواندن ردیف‌ها به صورت جریانی همراه با شماره خط برای گزارش خطا
+def _read_rows(stream, fmt):
+    if fmt == 'csv':
+        for line_no, row in enumerate(csv.DictReader(stream), start=2):
+            yield line_no, row
+        return
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError:
+            yield line_no, None
+
+
+def _is_true(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes')
+
+
+def _report(line_no, message):
+    click.echo(f'خط {line_no}: {message}', err=True)
+
+
+# حذف ردیف‌هایی که اسلاتشان در دیتابیس یا همین دسته قبلاً گرفته شده (با یک کوئری)
+def _drop_conflicts(batch):
+    taken = set(db.session.execute(
+        db.select(Appointment.consultant_id, Appointment.slot_start)
+        .where(Appointment.consultant_id.in_({fields['consultant_id'] for _, fields in batch}),
+               Appointment.slot_start.in_({fields['slot_start'] for _, fields in batch}))
+    ).tuples())
+    accepted = []
+    for line_no, fields in batch:
+        key = (fields['consultant_id'], fields['slot_start'])
+        if key in taken:
+            _report(line_no, 'این زمان قبلاً رزرو شده است.')
+            continue
+        taken.add(key)
+        accepted.append((line_no, fields))
+    return accepted
+
+
+# تغییر آمار روزانه برای نوبت‌های واردشده (همه فعال)
+def _stats_delta(rows):
+    delta = StatsDelta()
+    for fields in rows:
+        delta.add(fields['consultant_id'], fields['starts_at'], booked=1, confirmed=1 if fields['confirmed'] else 0)
+    return delta
+
+
+# درج یک دسته با یک executemany؛ اگر در این فاصله رزرو همزمانی تداخل ایجاد کند
+# ردیف‌ها یکی‌یکی درج می‌شوند تا خطای هر ردیف جداگانه گزارش شود
+def _insert_batch(batch, dry_run):
+    batch = _drop_conflicts(batch)
+    if dry_run or not batch:
+        db.session.rollback()
+        return len(batch)
+    try:
+        db.session.execute(db.insert(Appointment), [fields for _, fields in batch])
+        counters.bump('appointments')
+        day_stats.apply(_stats_delta(fields for _, fields in batch))
+        db.session.commit()
+        return len(batch)
+    except IntegrityError:
+        db.session.rollback()
+    inserted = 0
+    for line_no, fields in batch:
+        try:
+            db.session.execute(db.insert(Appointment), [fields])
+            counters.bump('appointments')
+            day_stats.apply(_stats_delta([fields]))
+            db.session.commit()
+            inserted += 1
+        except IntegrityError:
+            db.session.rollback()
+            _report(line_no, 'این زمان قبلاً رزرو شده است.')
+    return inserted
+
+
+@appointments_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='پیش‌فرض بر اساس پسوند فایل')
+@click.option('--batch-size', default=1000, show_default=True, help='تعداد ردیف در هر INSERT')
+@click.option('--dry-run', is_flag=True, help='فقط اعتبارسنجی؛ چیزی ذخیره نمی‌شود')
+def import_appointments(source, fmt, batch_size, dry_run):
+    """ورود نوبت‌ها از CSV یا JSONL با همان قوانین فرم رزرو"""
+    fmt = _detect_format(source.name, fmt)
+    imported = failed = 0
+    batch = []
+    for line_no, row in _read_rows(source, fmt):
+        try:
+            if not isinstance(row, dict):
+                raise BookingError('ردیف JSON معتبر نیست.')
+            if row.get('status') == 'cancelled':
+                raise BookingError('نوبت لغوشده وارد نمی‌شود.')
+            fields = validate_booking(row)
+        except BookingError as error:
+            _report(line_no, error)
+            failed += 1
+            continue
+        # در حالت dry-run چیزی درج نمی‌شود و شماره نوبتی هم مصرف نمی‌شود
+        if not dry_run:
+            fields['appointment_number'] = str(appointment_numbers.next())
+        fields['confirmed'] = _is_true(row.get('confirmed', ''))
+        batch.append((line_no, fields))
+        if len(batch) >= batch_size:
+            inserted = _insert_batch(batch, dry_run)
+            imported += inserted
+            failed += len(batch) - inserted
+            batch = []
+    if batch:
+        inserted = _insert_batch(batch, dry_run)
+        imported += inserted
+        failed += len(batch) - inserted
+
+    if dry_run:
+        click.echo(f'(dry-run) {imported} نوبت قابل ثبت است، {failed} ردیف خطا دارد.')
+    else:
+        click.echo(f'{imported} نوبت ثبت شد، {failed} ردیف خطا داشت.')
+
+
+@appointments_cli.command('export')
+@click.argument('output', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='پیش‌فرض بر اساس پسوند فایل')
+@click.option('--from', 'date_from', type=click.DateTime(['%Y-%m-%d']), help='از تاریخ (شامل)')
+@click.option('--to', 'date_to', type=click.DateTime(['%Y-%m-%d']), help='تا تاریخ (شامل)')
+@click.option('--consultant-id', type=int)
+@click.option('--batch-size', default=1000, show_default=True, help='تعداد ردیف در هر fetch از cursor')
+def export_appointments(output, fmt, date_from, date_to, consultant_id, batch_size):
+    """خروجی جریانی نوبت‌ها به CSV یا JSONL"""
+    fmt = _detect_format(output.name, fmt)
+    query = (db.select(Appointment.appointment_number, Appointment.name, Appointment.phone_number,
+                       Appointment.age, Appointment.education, Appointment.national_id,
+                       Consultant.name.label('consultant'), Appointment.starts_at, Appointment.confirmed,
+                       Appointment.status)
+             .join(Consultant, Appointment.consultant_id == Consultant.id)
+             .order_by(Appointment.id))
+    if date_from:
+        query = query.where(Appointment.starts_at >= date_from)
+    if date_to:
+        query = query.where(Appointment.starts_at < date_to + timedelta(days=1))
+    if consultant_id:
+        query = query.where(Appointment.consultant_id == consultant_id)
+
+    writer = csv.writer(output) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_FIELDS)
+    count = 0
+    # yield_per با cursor سمت سرور ردیف‌ها را دسته‌دسته می‌خواند
+    for row in db.session.execute(query.execution_options(yield_per=batch_size)):
+        values = list(row)
+        values[7] = row.starts_at.strftime('%Y-%m-%dT%H:%M')
+        values[8] = int(bool(row.confirmed))
+        if writer:
+            writer.writerow(values)
+        else:
+            output.write(json.dumps(dict(zip(EXPORT_FIELDS, values)), ensure_ascii=False) + '\n')
+        count += 1
+    click.echo(f'{count} نوبت خروجی گرفته شد.', err=True)
+
+
+@appointments_cli.command('rebuild-stats')
+def rebuild_stats():
+    """ساخت دوباره جدول consultant_day_stats از روی نوبت‌ها"""
+    count = day_stats.rebuild()
+    click.echo(f'آمار {count} روز-مشاور دوباره ساخته شد.')
+
+
+@appointments_cli.command('archive')
+@click.option('--older-than-days', type=click.IntRange(min=1), help='پیش‌فرض ARCHIVE_AFTER_DAYS')
+@click.option('--batch-size', type=click.IntRange(min=1), default=1000, show_default=True,
+              help='تعداد ردیف در هر تراکنش')
+@click.option('--pause', default=0.0, show_default=True, help='مکث (ثانیه) بین دسته‌ها برای کم کردن فشار روی دیتابیس')
+def archive_appointments(older_than_days, batch_size, pause):
+    """انتقال نوبت‌های قدیمی به جدول appointments_archive در دسته‌های محدود"""
+    days = older_than_days if older_than_days is not None else current_app.config['ARCHIVE_AFTER_DAYS']
+    if days < 1:
+        raise click.ClickException(f'ARCHIVE_AFTER_DAYS باید حداقل ۱ باشد (مقدار فعلی: {days}).')
+    cutoff = datetime.combine(datetime.now().date() - timedelta(days=days), datetime.min.time())
+    total = 0
+    while True:
+        moved = archive.archive_batch(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    click.echo(f'{total} نوبت قدیمی‌تر از {cutoff:%Y-%m-%d} آرشیو شد.')
+
+
+@notifications_cli.command('work')
+@click.option('--once', is_flag=True, help='فقط یک دسته ارسال شود و خارج شود')
+@click.option('--batch-size', type=int, help='پیش‌فرض NOTIFICATION_BATCH_SIZE')
+@click.option('--workers', type=int, help='تعداد thread ارسال؛ پیش‌فرض NOTIFICATION_WORKERS')
+@click.option('--interval', default=2.0, show_default=True, help='مکث (ثانیه) وقتی صف خالی است')
+def work_notifications(once, batch_size, workers, interval):
+    """ارسال پیام‌های outbox با retry و backoff"""
+    worker = notifications.create_worker(current_app, batch_size=batch_size, workers=workers)
+    try:
+        while True:
+            processed = worker.run_once()
+            if processed:
+                click.echo(f'{processed} پیام پردازش شد.', err=True)
+            if once:
+                break
+            if processed < worker.batch_size:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.shutdown()
@@ -0,0 +1,20 @@
+from models import db, Counter
+
+
+# افزایش شمارنده در همان تراکنش جاری (قبل از commit صدا زده شود)
+def bump(name, amount=1):
+    result = db.session.execute(
+        db.update(Counter).where(Counter.name == name).values(value=Counter.value + amount)
+    )
+    if result.rowcount == 0:
+        db.session.add(Counter(name=name, value=amount))
+        db.session.flush()
+
+
+# خواندن چند شمارنده با یک کوئری؛ شمارنده‌ای که هنوز ساخته نشده صفر است
+def get(*names):
+    rows = db.session.execute(db.select(Counter.name, Counter.value).where(Counter.name.in_(names)))
+    values = dict.fromkeys(names, 0)
+    for name, value in rows:
+        values[name] = value
+    return values
@@ -1,4 +1,5 @@
-from app import app, db, User, bcrypt
+from app import app, db, User
+from passwords import hasher
 
 with app.app_context():
     # حذف کاربر قبلی اگه باشه
@@ -6,7 +7,7 @@ with app.app_context():
     db.session.commit()
 
     # ساخت کاربر جدید
-    hashed_password = bcrypt.generate_password_hash('00000').decode('utf-8')
+    hashed_password = hasher.hash('00000')
     admin_user = User(username='karo', password=hashed_password, is_admin=True)
     db.session.add(admin_user)
     db.session.commit()
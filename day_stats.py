@@ -0,0 +1,133 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+import counters
+from models import db, Appointment, ArchivedAppointment, ConsultantDayStats
+from schedule_cache import schedules
+
+FIELDS = ('booked', 'confirmed', 'cancelled')
+MAX_RANGE_DAYS = 92
+
+stats_table = ConsultantDayStats.__table__
+
+
+# تغییرات یک عملیات به تفکیک (مشاور، روز)؛ در پایان با apply در همان تراکنش نوشته می‌شود
+class StatsDelta:
+    def __init__(self):
+        self._changes = defaultdict(lambda: dict.fromkeys(FIELDS, 0))
+
+    def add(self, consultant_id, starts_at, booked=0, confirmed=0, cancelled=0):
+        values = self._changes[(consultant_id, starts_at.date())]
+        values['booked'] += booked
+        values['confirmed'] += confirmed
+        values['cancelled'] += cancelled
+        return self
+
+    def rows(self):
+        return [{'consultant_id': consultant_id, 'day': day, **values}
+                for (consultant_id, day), values in self._changes.items() if any(values.values())]
+
+
+# upsert اتمی: ردیف نبود ساخته می‌شود، بود مقدارها اضافه می‌شوند (بدون race بین دو رزرو همزمان)
+def _upsert_statement(dialect):
+    if dialect == 'mysql':
+        statement = mysql.insert(stats_table)
+        return statement.on_duplicate_key_update(
+            {field: stats_table.c[field] + statement.inserted[field] for field in FIELDS})
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        statement = insert(stats_table)
+        return statement.on_conflict_do_update(
+            index_elements=['consultant_id', 'day'],
+            set_={field: stats_table.c[field] + statement.excluded[field] for field in FIELDS})
+    return None
+
+
+def apply(delta):
+    rows = delta.rows()
+    if not rows:
+        return
+    statement = _upsert_statement(db.session.get_bind().dialect.name)
+    if statement is not None:
+        db.session.execute(statement, rows)
+        return
+    # دیتابیس‌های دیگر: UPDATE و در صورت نبودن ردیف INSERT
+    for row in rows:
+        result = db.session.execute(
+            db.update(ConsultantDayStats)
+            .where(ConsultantDayStats.consultant_id == row['consultant_id'], ConsultantDayStats.day == row['day'])
+            .values({field: getattr(ConsultantDayStats, field) + row[field] for field in FIELDS})
+        )
+        if result.rowcount == 0:
+            db.session.execute(db.insert(ConsultantDayStats), [row])
+
+
+# خواندن آمار فقط از جدول تجمیعی؛ هزینه‌اش به تعداد نوبت‌ها بستگی ندارد
+def between(start_day, end_day, consultant_id=None):
+    query = (db.select(ConsultantDayStats)
+             .where(ConsultantDayStats.day >= start_day, ConsultantDayStats.day <= end_day)
+             .order_by(ConsultantDayStats.consultant_id, ConsultantDayStats.day))
+    if consultant_id is not None:
+        query = query.where(ConsultantDayStats.consultant_id == consultant_id)
+    return db.session.scalars(query).all()
+
+
+# جدول داشبورد: برای هر مشاور و هر روز بازه، آمار همراه با ظرفیت اسلات‌ها از کش برنامه‌ها
+def dashboard(start_day, end_day, consultant_id=None):
+    stats = {(row.consultant_id, row.day): row for row in between(start_day, end_day, consultant_id)}
+    days = [start_day + timedelta(days=offset) for offset in range((end_day - start_day).days + 1)]
+    if consultant_id is None:
+        consultants = schedules.all()
+    else:
+        consultants = [schedules.get(consultant_id)] if schedules.get(consultant_id) else []
+    report = []
+    for schedule in consultants:
+        cells, totals = [], dict.fromkeys(FIELDS + ('capacity',), 0)
+        for day in days:
+            row = stats.get((schedule.id, day))
+            cell = {field: getattr(row, field) if row else 0 for field in FIELDS}
+            cell['day'] = day
+            cell['capacity'] = sum(1 for _ in schedule.slots_on(day))
+            for field in totals:
+                totals[field] += cell[field]
+            cells.append(cell)
+        report.append({'consultant': schedule, 'days': cells, 'totals': totals})
+    return days, report
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _grouped(model):
+    day = db.func.date(model.starts_at)
+    active = model.status == 'active'
+    return db.session.execute(
+        db.select(model.consultant_id, day.label('day'),
+                  db.func.sum(db.case((active, 1), else_=0)),
+                  db.func.sum(db.case((db.and_(active, model.confirmed == db.true()), 1), else_=0)),
+                  db.func.sum(db.case((active, 0), else_=1)))
+        .group_by(model.consultant_id, day)
+    )
+
+
+# ساخت دوباره کل جدول از appointments و appointments_archive در یک تراکنش؛
+# لغوهای قبل از لغو نرم (که ردیفشان حذف شده) دیگر قابل شمارش نیستند
+def rebuild():
+    rows = {}
+    for model in (Appointment, ArchivedAppointment):
+        for consultant_id, raw_day, booked, confirmed, cancelled in _grouped(model):
+            key = (consultant_id, _as_date(raw_day))
+            row = rows.setdefault(key, {'consultant_id': key[0], 'day': key[1],
+                                        'booked': 0, 'confirmed': 0, 'cancelled': 0})
+            row['booked'] += booked or 0
+            row['confirmed'] += confirmed or 0
+            row['cancelled'] += cancelled or 0
+    db.session.execute(db.delete(ConsultantDayStats))
+    if rows:
+        db.session.execute(db.insert(ConsultantDayStats), list(rows.values()))
+    counters.bump('appointments')  # ETag پاسخ‌های آمار عوض شود
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,166 @@
+import json
+import threading
+import uuid
+from collections import deque
+from datetime import date
+
+# کاربر غیرادمین فقط رویداد نوبت‌های امروز را با همین فیلدهای صفحه نوبت‌های امروز می‌گیرد
+PUBLIC_FIELDS = ('id', 'appointment_number', 'name', 'phone_number', 'consultant_name', 'starts_at')
+
+
+def _format(event_id, kind, data):
+    return f'id: {event_id}\nevent: {kind}\ndata: {data}\n\n'
+
+
+# صف محدود هر کلاینت؛ کلاینتی که عقب بماند قطع می‌شود و با Last-Event-ID از بافر سراسری ادامه می‌دهد
+class Subscription:
+    def __init__(self, admin, size):
+        self.admin = admin
+        self.size = size
+        self.queue = deque()
+        self.overflowed = False
+
+    def push(self, message):
+        if message is None:
+            return
+        if len(self.queue) >= self.size:
+            self.overflowed = True
+            self.queue.clear()
+        elif not self.overflowed:
+            self.queue.append(message)
+
+
+# pub/sub داخل همین پردازه: رویدادهای نوبت بعد از commit منتشر می‌شوند و
+# آخرین history رویداد برای ادامه دادن از Last-Event-ID نگه داشته می‌شود.
+# شناسه رویداد «boot-seq» است تا بعد از راه‌اندازی مجدد، شناسه‌های قدیمی تشخیص داده شوند
+class EventBroker:
+    def __init__(self, history=1000, client_queue=100, max_subscribers=10):
+        self.boot = uuid.uuid4().hex[:8]
+        self.client_queue = client_queue
+        self.max_subscribers = max_subscribers
+        self._condition = threading.Condition()
+        self._history = deque(maxlen=history)  # (seq، پیام ادمین، پیام عمومی)
+        self._seq = 0
+        self._subscribers = set()
+
+    def last_id(self):
+        return f'{self.boot}-{self._seq}'
+
+    # public: داده نسخه عمومی رویداد؛ None یعنی کاربر غیرادمین این رویداد را نمی‌گیرد
+    def publish(self, kind, data, public=None):
+        with self._condition:
+            self._seq += 1
+            event_id = f'{self.boot}-{self._seq}'
+            admin_message = _format(event_id, kind, json.dumps(data, ensure_ascii=False))
+            public_message = public and _format(event_id, kind, json.dumps(public, ensure_ascii=False))
+            self._history.append((self._seq, admin_message, public_message))
+            for subscription in self._subscribers:
+                subscription.push(admin_message if subscription.admin else public_message)
+            self._condition.notify_all()
+
+    # ثبت کلاینت و پر کردن صفش با رویدادهای بعد از last_event_id، هر دو زیر یک قفل تا رویدادی گم یا تکرار نشود.
+    # اگر ادامه ممکن نباشد (شناسه ناشناخته، خارج از بافر یا بیشتر از ظرفیت صف) رویداد reset فرستاده می‌شود.
+    # هر stream باز یک thread را نگه می‌دارد؛ بیشتر از max_subscribers کلاینت None می‌گیرد
+    def subscribe(self, last_event_id, admin):
+        subscription = Subscription(admin, self.client_queue)
+        with self._condition:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            if last_event_id:
+                boot, _, seq = last_event_id.partition('-')
+                oldest = self._history[0][0] if self._history else self._seq + 1
+                missed = [entry for entry in self._history if entry[0] > int(seq)] if seq.isdigit() else []
+                if (boot != self.boot or not seq.isdigit() or int(seq) > self._seq
+                        or int(seq) + 1 < oldest or len(missed) > self.client_queue):
+                    subscription.push(_format(self.last_id(), 'reset', '{}'))
+                else:
+                    for _, admin_message, public_message in missed:
+                        subscription.push(admin_message if admin else public_message)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._condition:
+            self._subscribers.discard(subscription)
+
+    # پیام‌های آماده صف؛ لیست خالی یعنی timeout و None یعنی کلاینت عقب مانده و باید قطع شود
+    def wait(self, subscription, timeout):
+        with self._condition:
+            if not subscription.queue and not subscription.overflowed:
+                self._condition.wait(timeout)
+            if subscription.overflowed:
+                return None
+            messages = list(subscription.queue)
+            subscription.queue.clear()
+            return messages
+
+    # بدنه پاسخ text/event-stream؛ بدون request context و session دیتابیس اجرا می‌شود
+    def stream(self, subscription, keepalive=15, retry=3000):
+        try:
+            yield f'retry: {retry}\n\n'
+            while True:
+                messages = self.wait(subscription, keepalive)
+                if messages is None:
+                    return
+                if not messages:
+                    yield ': keepalive\n\n'
+                for message in messages:
+                    yield message
+        finally:
+            self.unsubscribe(subscription)
+
+    def resize(self, history):
+        with self._condition:
+            self._history = deque(self._history, maxlen=history)
+
+
+broker = EventBroker()
+
+# تنظیمات stream؛ در init_app از تنظیمات خوانده می‌شود
+keepalive_seconds = 15
+
+
+# داده ردیف نوبت تازه؛ بعد از flush و قبل از commit ساخته می‌شود تا بعد از commit کوئری اضافه نزند
+def created_payload(appointment, consultant_name):
+    return {
+        'id': appointment.id,
+        'appointment_number': appointment.appointment_number,
+        'name': appointment.name,
+        'phone_number': appointment.phone_number,
+        'age': appointment.age,
+        'education': appointment.education,
+        'national_id': appointment.national_id,
+        'consultant_id': appointment.consultant_id,
+        'consultant_name': consultant_name,
+        'starts_at': appointment.starts_at.strftime('%Y-%m-%dT%H:%M'),
+        'confirmed': bool(appointment.confirmed),
+        'status': appointment.status,
+    }
+
+
+# رویداد ثبت نوبت با همه فیلدهای لازم برای ساختن ردیف جدول
+def publish_created(payload):
+    public = None
+    if payload['starts_at'].startswith(date.today().isoformat()):
+        public = {field: payload[field] for field in PUBLIC_FIELDS}
+    broker.publish('created', payload, public)
+
+
+# تأیید و لغو (تکی یا گروهی) هر کدام یک رویداد با لیست idها؛ appointments: زوج‌های (id، starts_at).
+# صفحه عمومی فقط لغو نوبت‌های امروز را لازم دارد
+def publish_status(kind, appointments):
+    if not appointments:
+        return
+    today = date.today()
+    public_ids = [appointment_id for appointment_id, starts_at in appointments
+                  if kind == 'cancelled' and starts_at.date() == today]
+    broker.publish(kind, {'ids': [appointment_id for appointment_id, _ in appointments]},
+                   {'ids': public_ids} if public_ids else None)
+
+
+def init_app(app):
+    global keepalive_seconds
+    broker.resize(app.config.get('EVENTS_HISTORY', 1000))
+    broker.client_queue = app.config.get('EVENTS_CLIENT_QUEUE', 100)
+    broker.max_subscribers = app.config.get('EVENTS_MAX_SUBSCRIBERS', 10)
+    keepalive_seconds = app.config.get('EVENTS_KEEPALIVE_SECONDS', 15)
@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# مرزهای histogram زمان پاسخ (ثانیه)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# فقط وقتی INSTRUMENTATION_ENABLED روشن باشد listenerهای زمان‌سنجی ثبت می‌شوند
+_enabled = False
+
+
+# شمارش کوئری‌های SQL در هر درخواست
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def query_count():
+    return g.get('query_count', 0)
+
+
+# کوئری‌هایی که به خاطر کش زده نشدند
+def record_saved_query():
+    if has_request_context():
+        g.saved_queries = g.get('saved_queries', 0) + 1
+
+
+# زمان یک بخش دلخواه (مثلاً bcrypt) در Server-Timing همان درخواست
+def record_timing(name, seconds):
+    if _enabled and has_request_context():
+        timings = g.setdefault('timings', defaultdict(float))
+        timings[name] += seconds
+
+
+# آمار تجمعی هر endpoint در همین پردازه برای /metrics
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.duration_sum = Counter()
+        self.duration_buckets = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+        self.sql_statements = Counter()
+        self.sql_seconds = Counter()
+        self.render_seconds = Counter()
+        self.n_plus_one = Counter()
+
+    def observe(self, endpoint, total, sql_count, sql_time, render_time, n_plus_one):
+        with self._lock:
+            self.requests[endpoint] += 1
+            self.duration_sum[endpoint] += total
+            buckets = self.duration_buckets[endpoint]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if total <= bound:
+                    buckets[i] += 1
+            self.sql_statements[endpoint] += sql_count
+            self.sql_seconds[endpoint] += sql_time
+            self.render_seconds[endpoint] += render_time
+            self.n_plus_one[endpoint] += n_plus_one
+
+    # خروجی با فرمت متنی Prometheus
+    def render(self):
+        lines = []
+
+        def family(name, kind, help_text, values):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for endpoint, value in sorted(values.items()):
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {value:g}')
+
+        with self._lock:
+            family('app_requests_total', 'counter', 'Requests handled.', self.requests)
+            lines.append('# HELP app_request_duration_seconds Request wall time.')
+            lines.append('# TYPE app_request_duration_seconds histogram')
+            for endpoint, buckets in sorted(self.duration_buckets.items()):
+                for bound, count in zip(DURATION_BUCKETS, buckets):
+                    lines.append(f'app_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound:g}"}} {count}')
+                lines.append(f'app_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {self.requests[endpoint]}')
+                lines.append(f'app_request_duration_seconds_sum{{endpoint="{endpoint}"}} {self.duration_sum[endpoint]:g}')
+                lines.append(f'app_request_duration_seconds_count{{endpoint="{endpoint}"}} {self.requests[endpoint]}')
+            family('app_sql_statements_total', 'counter', 'SQL statements executed.', self.sql_statements)
+            family('app_sql_seconds_total', 'counter', 'Time spent executing SQL.', self.sql_seconds)
+            family('app_render_seconds_total', 'counter', 'Time spent rendering templates.', self.render_seconds)
+            family('app_n_plus_one_total', 'counter', 'Requests with a repeated-statement (N+1) pattern.', self.n_plus_one)
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+# زمان شروع روی execution context همان دستور نگه داشته می‌شود؛ دستوری که خطا بدهد
+# after_cursor_execute ندارد و چیزی روی اتصال pool شده باقی نمی‌گذارد
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and context is not None:
+        context.query_started = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'query_started', None)
+    if has_request_context() and started is not None:
+        g.sql_time = g.get('sql_time', 0.0) + time.perf_counter() - started
+        g.setdefault('statements', Counter())[statement] += 1
+
+
+def _before_render(sender, template, context, **extra):
+    g.render_started = time.perf_counter()
+
+
+def _after_render(sender, template, context, **extra):
+    if 'render_started' in g:
+        g.render_time = g.get('render_time', 0.0) + time.perf_counter() - g.pop('render_started')
+
+
+def _enable(app):
+    global _enabled
+    _enabled = True
+    threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 5)
+    event.listen(Engine, 'before_cursor_execute', _before_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def add_server_timing(response):
+        if 'request_started' not in g:
+            return response
+        total = time.perf_counter() - g.request_started
+        sql_time = g.get('sql_time', 0.0)
+        render_time = g.get('render_time', 0.0)
+        endpoint = request.endpoint or 'unknown'
+
+        # یک statement یکسان که بارها در یک درخواست اجرا شده نشانه الگوی N+1 است
+        repeated = [(statement, count) for statement, count in g.get('statements', Counter()).items()
+                    if count >= threshold]
+        for statement, count in repeated:
+            logger.warning('N+1 query pattern in %s: %d executions of %s', endpoint, count,
+                           ' '.join(statement.split())[:200])
+
+        metrics.observe(endpoint, total, query_count(), sql_time, render_time, 1 if repeated else 0)
+        parts = [f'db;dur={sql_time * 1000:.2f};desc="{query_count()} queries"',
+                 f'render;dur={render_time * 1000:.2f}']
+        parts += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in g.get('timings', {}).items()]
+        parts.append(f'total;dur={total * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(parts)
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+def init_app(app):
+    # تعداد کوئری‌ها در هدر پاسخ گزارش می‌شود
+    @app.after_request
+    def add_query_count_header(response):
+        response.headers['X-Query-Count'] = str(query_count())
+        response.headers['X-Queries-Saved'] = str(g.get('saved_queries', 0))
+        return response
+
+    app.jinja_env.globals['query_count'] = query_count
+
+    if app.config.get('INSTRUMENTATION_ENABLED'):
+        _enable(app)
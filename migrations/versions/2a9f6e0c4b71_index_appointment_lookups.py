@@ -0,0 +1,32 @@
+"""Index appointment lookup columns
+
+Revision ID: 2a9f6e0c4b71
+Revises: f1c7a93e5d28
+Create Date: 2026-10-18 17:08:36.640215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a9f6e0c4b71'
+down_revision = 'f1c7a93e5d28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.create_index('ix_appointments_user_id_starts_at', ['user_id', 'starts_at'], unique=False)
+        batch_op.create_index('ix_appointments_national_id', ['national_id'], unique=False)
+        batch_op.create_index('ix_appointments_phone_number', ['phone_number'], unique=False)
+        batch_op.create_index('ix_appointments_name', ['name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointments_name')
+        batch_op.drop_index('ix_appointments_phone_number')
+        batch_op.drop_index('ix_appointments_national_id')
+        batch_op.drop_index('ix_appointments_user_id_starts_at')
@@ -0,0 +1,35 @@
+"""Add counters table and index consultants.name
+
+Revision ID: 3b9e1d47c2a6
+Revises: 80fc5c64c773
+Create Date: 2026-10-18 10:05:13.904127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9e1d47c2a6'
+down_revision = '80fc5c64c773'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    counters = op.create_table('counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(counters, [{'name': 'consultants', 'value': 0}])
+
+    with op.batch_alter_table('consultants', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_consultants_name'), ['name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('consultants', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_consultants_name'))
+
+    op.drop_table('counters')
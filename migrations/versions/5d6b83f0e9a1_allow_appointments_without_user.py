@@ -0,0 +1,30 @@
+"""Allow appointments without a user
+
+Revision ID: 5d6b83f0e9a1
+Revises: e7a2c95b1f04
+Create Date: 2026-10-18 13:31:52.774015
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d6b83f0e9a1'
+down_revision = 'e7a2c95b1f04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.alter_column('user_id',
+               existing_type=sa.Integer(),
+               nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.alter_column('user_id',
+               existing_type=sa.Integer(),
+               nullable=False)
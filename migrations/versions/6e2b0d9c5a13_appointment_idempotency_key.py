@@ -0,0 +1,28 @@
+"""Add idempotency_key to appointments
+
+Revision ID: 6e2b0d9c5a13
+Revises: 2a9f6e0c4b71
+Create Date: 2026-10-18 18:02:37.604125
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2b0d9c5a13'
+down_revision = '2a9f6e0c4b71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint(batch_op.f('uq_appointments_idempotency_key'), ['idempotency_key'])
+
+
+def downgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('uq_appointments_idempotency_key'), type_='unique')
+        batch_op.drop_column('idempotency_key')
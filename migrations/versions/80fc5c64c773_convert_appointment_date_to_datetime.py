@@ -0,0 +1,77 @@
+"""Convert appointments.date to a DateTime starts_at column
+
+Revision ID: 80fc5c64c773
+Revises: 58a48d2508ff
+Create Date: 2026-10-18 09:12:40.218311
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = '80fc5c64c773'
+down_revision = '58a48d2508ff'
+branch_labels = None
+depends_on = None
+
+# هر دسته در تراکنش جداگانه commit می‌شود تا جدول بزرگ قفل طولانی نگیرد
+BATCH_SIZE = 5000
+DATE_FORMATS = ('%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y/%m/%d')
+
+
+def _parse_date(value):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    raise ValueError(f'Unrecognised appointment date: {value!r}')
+
+
+def _backfill(select_sql, update_sql, convert):
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        with op.get_context().autocommit_block():
+            rows = bind.execute(sa.text(select_sql), {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+            if not rows:
+                break
+            bind.execute(sa.text(update_sql), [{'id': row[0], 'value': convert(row[1])} for row in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('starts_at', sa.DateTime(), nullable=True))
+
+    _backfill(
+        'SELECT id, date FROM appointments WHERE id > :last_id AND starts_at IS NULL ORDER BY id LIMIT :limit',
+        'UPDATE appointments SET starts_at = :value WHERE id = :id',
+        _parse_date,
+    )
+
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.alter_column('starts_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index('ix_appointments_consultant_id_starts_at', ['consultant_id', 'starts_at'], unique=False)
+        batch_op.create_index('ix_appointments_starts_at', ['starts_at'], unique=False)
+        batch_op.drop_column('date')
+
+
+def downgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('date', mysql.VARCHAR(length=50), nullable=True))
+
+    _backfill(
+        'SELECT id, starts_at FROM appointments WHERE id > :last_id AND date IS NULL ORDER BY id LIMIT :limit',
+        'UPDATE appointments SET date = :value WHERE id = :id',
+        lambda value: (value if isinstance(value, datetime) else datetime.fromisoformat(str(value))).strftime('%Y-%m-%dT%H:%M'),
+    )
+
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.alter_column('date', existing_type=mysql.VARCHAR(length=50), nullable=False)
+        batch_op.drop_index('ix_appointments_starts_at')
+        batch_op.drop_index('ix_appointments_consultant_id_starts_at')
+        batch_op.drop_column('starts_at')
@@ -0,0 +1,25 @@
+"""Seed the appointments change counter
+
+Revision ID: 9a0d4e6c7b15
+Revises: 5d6b83f0e9a1
+Create Date: 2026-10-18 14:48:27.310266
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a0d4e6c7b15'
+down_revision = '5d6b83f0e9a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    counters = sa.table('counters', sa.column('name', sa.String), sa.column('value', sa.BigInteger))
+    op.bulk_insert(counters, [{'name': 'appointments', 'value': 0}])
+
+
+def downgrade():
+    op.execute("DELETE FROM counters WHERE name = 'appointments'")
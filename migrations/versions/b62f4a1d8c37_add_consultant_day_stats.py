@@ -0,0 +1,45 @@
+"""Add consultant_day_stats and backfill it from appointments
+
+Revision ID: b62f4a1d8c37
+Revises: 9a0d4e6c7b15
+Create Date: 2026-10-18 15:20:41.583019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b62f4a1d8c37'
+down_revision = '9a0d4e6c7b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('consultant_day_stats',
+    sa.Column('consultant_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('booked', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('confirmed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cancelled', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['consultant_id'], ['consultants.id'], ),
+    sa.PrimaryKeyConstraint('consultant_id', 'day')
+    )
+    with op.batch_alter_table('consultant_day_stats', schema=None) as batch_op:
+        batch_op.create_index('ix_consultant_day_stats_day', ['day'], unique=False)
+
+    # لغوهای قبلی حذف شده‌اند و فقط نوبت‌های فعال قابل شمارش‌اند
+    op.execute(
+        "INSERT INTO consultant_day_stats (consultant_id, day, booked, confirmed, cancelled) "
+        "SELECT consultant_id, DATE(starts_at), COUNT(*), "
+        "SUM(CASE WHEN confirmed THEN 1 ELSE 0 END), 0 "
+        "FROM appointments GROUP BY consultant_id, DATE(starts_at)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('consultant_day_stats', schema=None) as batch_op:
+        batch_op.drop_index('ix_consultant_day_stats_day')
+
+    op.drop_table('consultant_day_stats')
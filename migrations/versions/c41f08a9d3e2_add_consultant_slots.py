@@ -0,0 +1,61 @@
+"""Add consultant slot length and unique appointment slots
+
+Revision ID: c41f08a9d3e2
+Revises: 3b9e1d47c2a6
+Create Date: 2026-10-18 11:22:48.150392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f08a9d3e2'
+down_revision = '3b9e1d47c2a6'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade():
+    with op.batch_alter_table('consultants', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('slot_minutes', sa.Integer(), server_default='30', nullable=False))
+
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('slot_start', sa.DateTime(), nullable=True))
+
+    # پر کردن slot_start در دسته‌های بازه id
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text('SELECT MAX(id) FROM appointments')).scalar() or 0
+    for low in range(0, max_id, BATCH_SIZE):
+        with op.get_context().autocommit_block():
+            bind.execute(
+                sa.text('UPDATE appointments SET slot_start = starts_at WHERE id > :low AND id <= :high'),
+                {'low': low, 'high': low + BATCH_SIZE},
+            )
+
+    # از نوبت‌های تکراری قدیمی فقط اولین ردیف اسلات را نگه می‌دارد
+    duplicates = bind.execute(sa.text(
+        'SELECT a.id FROM appointments a JOIN ('
+        ' SELECT consultant_id, starts_at, MIN(id) AS first_id FROM appointments'
+        ' GROUP BY consultant_id, starts_at HAVING COUNT(*) > 1'
+        ') d ON a.consultant_id = d.consultant_id AND a.starts_at = d.starts_at AND a.id > d.first_id'
+    )).scalars().all()
+    for i in range(0, len(duplicates), BATCH_SIZE):
+        bind.execute(
+            sa.text('UPDATE appointments SET slot_start = NULL WHERE id IN :ids').bindparams(sa.bindparam('ids', expanding=True)),
+            {'ids': duplicates[i:i + BATCH_SIZE]},
+        )
+
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_appointments_consultant_id_slot_start', ['consultant_id', 'slot_start'])
+
+
+def downgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_appointments_consultant_id_slot_start', type_='unique')
+        batch_op.drop_column('slot_start')
+
+    with op.batch_alter_table('consultants', schema=None) as batch_op:
+        batch_op.drop_column('slot_minutes')
@@ -0,0 +1,56 @@
+"""Widen appointment_number and make it unique
+
+Revision ID: e7a2c95b1f04
+Revises: c41f08a9d3e2
+Create Date: 2026-10-18 12:40:06.581927
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2c95b1f04'
+down_revision = 'c41f08a9d3e2'
+branch_labels = None
+depends_on = None
+
+FIRST_NUMBER = 10000
+BATCH_SIZE = 5000
+
+
+def upgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.alter_column('appointment_number',
+               existing_type=mysql.VARCHAR(length=4),
+               type_=sa.String(length=12),
+               existing_nullable=False)
+
+    # شماره‌های تکراری قدیمی (به جز اولین ردیف) شماره جدید از 10000 به بعد می‌گیرند
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        'SELECT a.id FROM appointments a JOIN ('
+        ' SELECT appointment_number, MIN(id) AS first_id FROM appointments'
+        ' GROUP BY appointment_number HAVING COUNT(*) > 1'
+        ') d ON a.appointment_number = d.appointment_number AND a.id > d.first_id ORDER BY a.id'
+    )).scalars().all()
+    params = [{'number': str(FIRST_NUMBER + i), 'id': appointment_id} for i, appointment_id in enumerate(duplicates)]
+    for i in range(0, len(params), BATCH_SIZE):
+        bind.execute(sa.text('UPDATE appointments SET appointment_number = :number WHERE id = :id'),
+                     params[i:i + BATCH_SIZE])
+    next_number = FIRST_NUMBER + len(duplicates)
+
+    counters = sa.table('counters', sa.column('name', sa.String), sa.column('value', sa.BigInteger))
+    op.bulk_insert(counters, [{'name': 'appointment_number', 'value': next_number - 1}])
+
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_appointments_appointment_number'), ['appointment_number'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_appointments_appointment_number'))
+
+    op.execute("DELETE FROM counters WHERE name = 'appointment_number'")
+    # ستون به چهار کاراکتر برنمی‌گردد چون شماره‌های جدید در آن جا نمی‌شوند
@@ -0,0 +1,62 @@
+"""Soft-delete appointments and consultants, add appointments_archive
+
+Revision ID: f1c7a93e5d28
+Revises: d3e8b57a2f90
+Create Date: 2026-10-18 16:31:54.218906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c7a93e5d28'
+down_revision = 'd3e8b57a2f90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=10), server_default='active', nullable=False))
+        batch_op.add_column(sa.Column('cancelled_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('consultants', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    op.create_table('appointments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('phone_number', sa.String(length=15), nullable=False),
+    sa.Column('age', sa.Integer(), nullable=False),
+    sa.Column('education', sa.String(length=100), nullable=False),
+    sa.Column('national_id', sa.String(length=15), nullable=False),
+    sa.Column('consultant_id', sa.Integer(), nullable=False),
+    sa.Column('starts_at', sa.DateTime(), nullable=False),
+    sa.Column('slot_start', sa.DateTime(), nullable=True),
+    sa.Column('confirmed', sa.Boolean(), nullable=True),
+    sa.Column('appointment_number', sa.String(length=12), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('cancelled_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('appointments_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_appointments_archive_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_appointments_archive_appointment_number'), ['appointment_number'], unique=False)
+        batch_op.create_index('ix_appointments_archive_consultant_id_starts_at', ['consultant_id', 'starts_at'], unique=False)
+        batch_op.create_index('ix_appointments_archive_starts_at', ['starts_at'], unique=False)
+
+
+def downgrade():
+    op.drop_table('appointments_archive')
+
+    with op.batch_alter_table('consultants', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
+
+    # نوبت‌های لغوشده نرم قبل از حذف ستون status پاک می‌شوند تا مثل قبل فقط نوبت‌های فعال بمانند
+    op.execute("DELETE FROM appointments WHERE status = 'cancelled'")
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.drop_column('cancelled_at')
+        batch_op.drop_column('status')
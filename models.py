@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 
@@ -14,11 +16,13 @@ class User(UserMixin, db.Model):
 class Consultant(db.Model):
     __tablename__ = 'consultants'
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     specialty = db.Column(db.String(100), nullable=False)
     time_start = db.Column(db.String(10), nullable=False)
     time_end = db.Column(db.String(10), nullable=False)
     days = db.Column(db.String(100), nullable=False)
+    slot_minutes = db.Column(db.Integer, nullable=False, default=30, server_default='30')  # طول هر نوبت به دقیقه
+    deleted_at = db.Column(db.DateTime)  # حذف نرم؛ نوبت‌های قبلی همچنان به مشاور اشاره می‌کنند
 
     def __repr__(self):
         return f'<Consultant {self.name}>'
@@ -26,15 +30,140 @@ class Consultant(db.Model):
 class Appointment(db.Model):
     __tablename__ = 'appointments'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))  # نوبت مهمان یا import شده کاربر ندارد
     name = db.Column(db.String(100), nullable=False)
     phone_number = db.Column(db.String(15), nullable=False)
     age = db.Column(db.Integer, nullable=False)
     education = db.Column(db.String(100), nullable=False)
     national_id = db.Column(db.String(15), nullable=False)
     consultant_id = db.Column(db.Integer, db.ForeignKey('consultants.id'), nullable=False)  # کلید خارجی جدید
-    date = db.Column(db.String(50), nullable=False)
+    starts_at = db.Column(db.DateTime, nullable=False)
+    slot_start = db.Column(db.DateTime)  # زمان اسلات رزروشده؛ یکتا برای هر مشاور
+    confirmed = db.Column(db.Boolean, default=False)
+    appointment_number = db.Column(db.String(12), nullable=False, unique=True, index=True)
+    # لغو نرم: ردیف می‌ماند و slot_start خالی می‌شود تا اسلات دوباره قابل رزرو باشد
+    status = db.Column(db.String(10), nullable=False, default='active', server_default='active')  # active یا cancelled
+    cancelled_at = db.Column(db.DateTime)
+    idempotency_key = db.Column(db.String(64), unique=True)  # کلید فرم رزرو؛ ارسال دوباره همان فرم نوبت دوم نمی‌سازد
+
+    consultant = db.relationship('Consultant', backref='appointments', lazy=True)  # رابطه
+
+    __table_args__ = (
+        db.Index('ix_appointments_consultant_id_starts_at', 'consultant_id', 'starts_at'),
+        db.Index('ix_appointments_starts_at', 'starts_at'),
+        # مسیرهای جستجو: پروفایل کاربر و جستجوی ادمین (کد ملی، تلفن، پیشوند نام)
+        db.Index('ix_appointments_user_id_starts_at', 'user_id', 'starts_at'),
+        db.Index('ix_appointments_national_id', 'national_id'),
+        db.Index('ix_appointments_phone_number', 'phone_number'),
+        db.Index('ix_appointments_name', 'name'),
+        db.UniqueConstraint('consultant_id', 'slot_start', name='uq_appointments_consultant_id_slot_start'),
+    )
+
+    # شرط‌های فیلتر لیست نوبت‌ها؛ پنل ادمین و عملیات گروهی روی همین شرط‌ها کار می‌کنند
+    @classmethod
+    def filter_criteria(cls, consultant_id=None, confirmed=None, starts_from=None, starts_before=None, after=None,
+                        status='active', search=None):
+        criteria = []
+        if search:
+            criteria.append(cls.search_filter(*search))
+        if status:
+            criteria.append(cls.status == status)
+        if consultant_id:
+            criteria.append(cls.consultant_id == consultant_id)
+        if confirmed is not None:
+            criteria.append(cls.confirmed == confirmed)
+        if starts_from:
+            criteria.append(cls.starts_at >= starts_from)
+        if starts_before:
+            criteria.append(cls.starts_at < starts_before)
+        if after:
+            criteria.append(cls.id > after)
+        return criteria
+
+    # لیست صفحه‌بندی‌شده (keyset روی id) با مشاور join شده در همان کوئری
+    @classmethod
+    def listing(cls, *args, **kwargs):
+        query = cls.query.join(cls.consultant).options(db.contains_eager(cls.consultant))
+        return query.filter(*cls.filter_criteria(*args, **kwargs)).order_by(cls.id)
+
+    # جستجوی دقیق روی کد ملی، تلفن و شماره نوبت و جستجوی پیشوندی روی نام؛
+    # پیشوند به بازه [value, value+1) تبدیل می‌شود تا ایندکس name در همه دیتابیس‌ها استفاده شود
+    SEARCH_FIELDS = ('national_id', 'phone_number', 'appointment_number', 'name')
+
+    @classmethod
+    def search_filter(cls, field, value):
+        if field == 'name':
+            upper = value[:-1] + chr(ord(value[-1]) + 1)
+            return db.and_(cls.name >= value, cls.name < upper, cls.name.startswith(value, autoescape=True))
+        return getattr(cls, field) == value
+
+    # کوئری بازه زمانی [start, end) که از ایندکس starts_at استفاده می‌کند
+    @classmethod
+    def between(cls, start, end, consultant_id=None):
+        query = cls.query.filter(cls.starts_at >= start, cls.starts_at < end, cls.status == 'active')
+        if consultant_id is not None:
+            query = query.filter(cls.consultant_id == consultant_id)
+        return query
+
+# نوبت‌های قدیمی که با فرمان archive از جدول appointments منتقل شده‌اند
+class ArchivedAppointment(db.Model):
+    __tablename__ = 'appointments_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # همان id جدول appointments
+    user_id = db.Column(db.Integer, index=True)
+    name = db.Column(db.String(100), nullable=False)
+    phone_number = db.Column(db.String(15), nullable=False)
+    age = db.Column(db.Integer, nullable=False)
+    education = db.Column(db.String(100), nullable=False)
+    national_id = db.Column(db.String(15), nullable=False)
+    consultant_id = db.Column(db.Integer, nullable=False)
+    starts_at = db.Column(db.DateTime, nullable=False)
+    slot_start = db.Column(db.DateTime)
     confirmed = db.Column(db.Boolean, default=False)
-    appointment_number = db.Column(db.String(4), nullable=False)
+    appointment_number = db.Column(db.String(12), nullable=False, index=True)
+    status = db.Column(db.String(10), nullable=False)
+    cancelled_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_appointments_archive_consultant_id_starts_at', 'consultant_id', 'starts_at'),
+        db.Index('ix_appointments_archive_starts_at', 'starts_at'),
+    )
+
+# آمار روزانه هر مشاور که همراه هر رزرو/تأیید/لغو در همان تراکنش به‌روز می‌شود
+class ConsultantDayStats(db.Model):
+    __tablename__ = 'consultant_day_stats'
+    consultant_id = db.Column(db.Integer, db.ForeignKey('consultants.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    booked = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # نوبت‌های فعال
+    confirmed = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    cancelled = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        db.Index('ix_consultant_day_stats_day', 'day'),
+    )
+
+# صف خروجی پیامک‌ها؛ همراه نوبت در همان تراکنش نوشته و بعداً توسط worker ارسال می‌شود
+class Notification(db.Model):
+    __tablename__ = 'notification_outbox'
+    id = db.Column(db.Integer, primary_key=True)
+    idempotency_key = db.Column(db.String(100), nullable=False, unique=True)
+    kind = db.Column(db.String(20), nullable=False)  # booked، confirmed یا reminder
+    appointment_id = db.Column(db.Integer, index=True)  # بدون کلید خارجی تا حذف نوبت را قفل نکند
+    recipient = db.Column(db.String(15), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='pending')  # pending، sending، sent، failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False)  # در حالت sending پایان مهلت worker است
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_notification_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
 
-    consultant = db.relationship('Consultant', backref='appointments', lazy=True)  # رابطه
\ No newline at end of file
+# شمارنده‌های نسخه جدول‌ها که بین workerها مشترک است
+class Counter(db.Model):
+    __tablename__ = 'counters'
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
@@ -0,0 +1,191 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from werkzeug.utils import import_string
+
+from models import db, Notification
+
+logger = logging.getLogger(__name__)
+
+MESSAGES = {
+    'booked': 'نوبت مشاوره شما با شماره {number} برای {when} ثبت شد.',
+    'confirmed': 'نوبت مشاوره شما با شماره {number} برای {when} تأیید شد.',
+    'reminder': 'یادآوری: نوبت مشاوره شما با شماره {number} در {when} است.',
+}
+
+
+# رابط ارسال؛ idempotency_key به سرویس‌دهنده داده می‌شود تا ارسال تکراری بعد از retry را نادیده بگیرد
+class Sender(ABC):
+    @abstractmethod
+    def send(self, recipient, message, idempotency_key):
+        ...
+
+
+# فقط در لاگ می‌نویسد؛ پیش‌فرض تا سرویس پیامک واقعی تنظیم شود
+class LogSender(Sender):
+    def send(self, recipient, message, idempotency_key):
+        logger.info('SMS to %s [%s]: %s', recipient, idempotency_key, message)
+
+
+# ارسال‌کننده جعلی برای تست؛ پیام‌ها را نگه می‌دارد و می‌تواند چند بار اول خطا بدهد
+class FakeSender(Sender):
+    def __init__(self, fail_times=0):
+        self.fail_times = fail_times
+        self.sent = {}
+        self._lock = threading.Lock()
+
+    def send(self, recipient, message, idempotency_key):
+        with self._lock:
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise ConnectionError('fake sender failure')
+            self.sent.setdefault(idempotency_key, (recipient, message))
+
+
+SENDERS = {'log': LogSender, 'fake': FakeSender}
+
+# فاصله یادآوری تا شروع نوبت؛ در init_app از تنظیمات خوانده می‌شود
+reminder_lead = timedelta(hours=24)
+
+
+def _message(kind, appointment):
+    return MESSAGES[kind].format(number=appointment.appointment_number,
+                                 when=appointment.starts_at.strftime('%Y/%m/%d %H:%M'))
+
+
+def _row(kind, appointment, send_at):
+    return {
+        'idempotency_key': f'{kind}:{appointment.appointment_number}',
+        'kind': kind,
+        'appointment_id': appointment.id,
+        'recipient': appointment.phone_number,
+        'message': _message(kind, appointment),
+        'status': 'pending',
+        'attempts': 0,
+        'next_attempt_at': send_at,
+        'created_at': datetime.now(),
+    }
+
+
+# ردیف‌های outbox در همان تراکنش نوبت اضافه می‌شوند؛ commit نشدن نوبت یعنی پیامی هم نمی‌رود
+def enqueue(kind, appointments):
+    rows = [_row(kind, appointment, datetime.now()) for appointment in appointments]
+    if rows:
+        db.session.execute(db.insert(Notification), rows)
+
+
+# پیام ثبت نوبت و یادآوری قبل از شروع با یک INSERT؛
+# اگر تا شروع نوبت کمتر از فاصله یادآوری مانده، یادآوری لازم نیست
+def enqueue_booking(appointment):
+    now = datetime.now()
+    rows = [_row('booked', appointment, now)]
+    if appointment.starts_at - reminder_lead > now:
+        rows.append(_row('reminder', appointment, appointment.starts_at - reminder_lead))
+    db.session.execute(db.insert(Notification), rows)
+
+
+# پیام‌های ارسال‌نشده نوبت‌های لغوشده دیگر نباید بروند
+def drop_pending(appointment_ids):
+    if appointment_ids:
+        db.session.execute(
+            db.delete(Notification)
+            .where(Notification.appointment_id.in_(appointment_ids), Notification.status == 'pending')
+            .execution_options(synchronize_session=False)
+        )
+
+
+class OutboxWorker:
+    def __init__(self, sender, batch_size=100, workers=4, max_attempts=5, backoff=30, lease=300):
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='outbox')
+
+    # برداشتن یک دسته: ردیف‌های sending که مهلتشان تمام شده (worker از کار افتاده) دوباره برداشته می‌شوند
+    def _claim(self):
+        now = datetime.now()
+        rows = db.session.execute(
+            db.select(Notification.id, Notification.recipient, Notification.message,
+                      Notification.idempotency_key, Notification.attempts)
+            .where(Notification.status.in_(('pending', 'sending')), Notification.next_attempt_at <= now)
+            .order_by(Notification.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if rows:
+            db.session.execute(
+                db.update(Notification).where(Notification.id.in_([row.id for row in rows]))
+                .values(status='sending', next_attempt_at=now + timedelta(seconds=self.lease))
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+        return rows
+
+    # ارسال‌ها در thread pool انجام می‌شود و نتیجه در thread اصلی در دیتابیس ثبت می‌شود
+    def run_once(self):
+        rows = self._claim()
+        if not rows:
+            return 0
+        futures = [(row, self._executor.submit(self.sender.send, row.recipient, row.message, row.idempotency_key))
+                   for row in rows]
+        now = datetime.now()
+        sent, retries = [], []
+        for row, future in futures:
+            try:
+                future.result()
+                sent.append(row.id)
+            except Exception as error:
+                attempts = row.attempts + 1
+                if attempts >= self.max_attempts:
+                    status, next_attempt_at = 'failed', now
+                    logger.error('notification %s failed permanently: %s', row.idempotency_key, error)
+                else:
+                    # backoff نمایی: 30، 60، 120، ... ثانیه
+                    status, next_attempt_at = 'pending', now + timedelta(seconds=self.backoff * 2 ** (attempts - 1))
+                retries.append({'notification_id': row.id, 'status': status, 'attempts': attempts,
+                                'next_attempt_at': next_attempt_at, 'last_error': str(error)[:500]})
+        if sent:
+            db.session.execute(
+                db.update(Notification).where(Notification.id.in_(sent))
+                .values(status='sent', sent_at=now, attempts=Notification.attempts + 1, last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+        if retries:
+            table = Notification.__table__
+            db.session.execute(
+                table.update().where(table.c.id == db.bindparam('notification_id'))
+                .values(status=db.bindparam('status'), attempts=db.bindparam('attempts'),
+                        next_attempt_at=db.bindparam('next_attempt_at'), last_error=db.bindparam('last_error')),
+                retries,
+            )
+        db.session.commit()
+        return len(rows)
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+
+def create_sender(app):
+    name = app.config.get('NOTIFICATION_SENDER', 'log')
+    return SENDERS[name]() if name in SENDERS else import_string(name)()
+
+
+def create_worker(app, **options):
+    settings = {
+        'batch_size': app.config.get('NOTIFICATION_BATCH_SIZE', 100),
+        'workers': app.config.get('NOTIFICATION_WORKERS', 4),
+        'max_attempts': app.config.get('NOTIFICATION_MAX_ATTEMPTS', 5),
+        'backoff': app.config.get('NOTIFICATION_BACKOFF_SECONDS', 30),
+    }
+    settings.update({key: value for key, value in options.items() if value is not None})
+    return OutboxWorker(create_sender(app), **settings)
+
+
+def init_app(app):
+    global reminder_lead
+    reminder_lead = timedelta(hours=app.config.get('NOTIFICATION_REMINDER_HOURS', 24))
@@ -0,0 +1,53 @@
+import os
+import threading
+
+from models import db, Counter
+
+# شماره‌های جدید از این مقدار شروع می‌شوند تا با شماره‌های چهاررقمی قدیمی تداخل نداشته باشند
+FIRST_NUMBER = 10000
+
+
+# هر worker یک بلوک از شماره‌ها را یکجا از جدول counters رزرو می‌کند
+# و بقیه شماره‌ها را بدون رفت‌وبرگشت به دیتابیس تحویل می‌دهد
+class BlockAllocator:
+    def __init__(self, name, block_size=100):
+        self.name = name
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = 0
+        self._limit = 0
+
+    def next(self):
+        with self._lock:
+            # بعد از fork بلوک پردازه والد نباید دوباره استفاده شود
+            if self._pid != os.getpid() or self._next >= self._limit:
+                self._reserve()
+            value = self._next
+            self._next += 1
+            return value
+
+    # بلوک فعلی کنار گذاشته می‌شود (مثلاً بعد از بازسازی دیتابیس در بنچمارک)
+    def reset(self):
+        with self._lock:
+            self._next = self._limit = 0
+
+    # رزرو در اتصال و تراکنش جداگانه انجام می‌شود تا با rollback نوبت برنگردد
+    def _reserve(self):
+        with db.engine.begin() as conn:
+            result = conn.execute(
+                db.update(Counter).where(Counter.name == self.name).values(value=Counter.value + self.block_size)
+            )
+            if result.rowcount == 0:
+                conn.execute(db.insert(Counter).values(name=self.name, value=FIRST_NUMBER - 1 + self.block_size))
+            high = conn.execute(db.select(Counter.value).where(Counter.name == self.name)).scalar_one()
+        self._pid = os.getpid()
+        self._next = high - self.block_size + 1
+        self._limit = high + 1
+
+
+appointment_numbers = BlockAllocator('appointment_number')
+
+
+def init_app(app):
+    appointment_numbers.block_size = app.config.get('APPOINTMENT_NUMBER_BLOCK', 100)
@@ -0,0 +1,138 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+
+from flask import current_app, request, session
+from flask_login import current_user
+
+import counters
+import instrumentation
+from schedule_cache import schedules
+
+
+# کش LRU داخل همین پردازه؛ برای تست‌ها جایگزین محلی backend مشترک هم هست
+class MemoryBackend:
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# کش مشترک بین workerها روی Redis؛ پکیج redis فقط در این حالت لازم است
+class RedisBackend:
+    def __init__(self, url, prefix='page:'):
+        import redis
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, value, ex=ttl)
+
+    # کلیدهای قدیمی با نسخه شمارنده‌ها دیگر خوانده نمی‌شوند و با TTL منقضی می‌شوند
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + '*'):
+            self._client.delete(key)
+
+
+class PageCache:
+    def __init__(self, backend=None, ttl=300):
+        self.backend = backend
+        self.ttl = ttl
+
+    def get(self, key):
+        if self.backend is None:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            return None
+        content_type, _, body = value.partition(b'\n')
+        return content_type.decode('ascii'), body
+
+    def set(self, key, content_type, body):
+        if self.backend is not None:
+            self.backend.set(key, content_type.encode('ascii') + b'\n' + body, self.ttl)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+
+pages = PageCache()
+
+
+# صفحه‌ای که پیام فلش یا محتوای مخصوص کاربر دارد نباید از کش بیاید یا در کش برود
+def _cacheable():
+    return (request.method == 'GET' and pages.backend is not None
+            and not session.get('_flashes') and not current_user.is_authenticated)
+
+
+# کلید کش با نسخه شمارنده جدول‌هایی که صفحه به آن‌ها وابسته است ساخته می‌شود؛
+# bump همان جدول فقط صفحه‌های وابسته را باطل می‌کند
+def cached_page(*tables, daily=False):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _cacheable():
+                return view(*args, **kwargs)
+            versions = counters.get(*tables) if tables else {}
+            if 'consultants' in versions:  # صفحه از کش برنامه کاری مشاورها رندر می‌شود، نه مستقیم از دیتابیس
+                versions['consultants'] = schedules.sync(versions['consultants'])
+            key = '|'.join([request.endpoint, request.full_path]
+                           + [f'{name}={versions[name]}' for name in tables])
+            if daily:  # محتوای صفحه با عوض شدن روز تغییر می‌کند
+                key += '|' + date.today().isoformat()
+            key = hashlib.sha1(key.encode('utf-8')).hexdigest()
+            hit = pages.get(key)
+            if hit is not None:
+                instrumentation.record_saved_query()
+                content_type, body = hit
+                response = current_app.response_class(body, content_type=content_type)
+                response.headers['X-Page-Cache'] = 'hit'
+                return response
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                pages.set(key, response.content_type, response.get_data())
+            response.headers['X-Page-Cache'] = 'miss'
+            return response
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    pages.ttl = app.config.get('PAGE_CACHE_TTL', 300)
+    backend = app.config.get('PAGE_CACHE_BACKEND', 'memory')
+    if backend == 'memory':
+        pages.backend = MemoryBackend(app.config.get('PAGE_CACHE_SIZE', 256))
+    elif backend == 'redis':
+        pages.backend = RedisBackend(app.config['PAGE_CACHE_URL'])
+    else:
+        pages.backend = None
@@ -0,0 +1,63 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+import instrumentation
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+
+# هش و بررسی رمز عبور در یک thread pool محدود انجام می‌شود؛ bcrypt در حین محاسبه
+# GIL را آزاد می‌کند و تعداد محاسبات همزمان از pool_size بیشتر نمی‌شود
+class PasswordHasher:
+    def __init__(self, rounds=12, pool_size=4, queue_timeout=10):
+        self._executor = None
+        self.configure(rounds, pool_size, queue_timeout)
+
+    def configure(self, rounds, pool_size, queue_timeout=10):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.rounds = rounds
+        self.pool_size = pool_size
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='bcrypt')
+        # حداکثر کارهای در صف؛ درخواست‌های اضافه به جای انباشته شدن خطا می‌گیرند
+        self._slots = threading.BoundedSemaphore(pool_size * 4)
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy('password hashing pool is saturated')
+        started = time.perf_counter()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+            instrumentation.record_timing('bcrypt', time.perf_counter() - started)
+
+    def hash(self, password):
+        salt = bcrypt.gensalt(self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password, hashed):
+        try:
+            return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:  # هش نامعتبر در دیتابیس
+            return False
+
+    # هشی که با cost متفاوتی ساخته شده باید بعد از ورود موفق دوباره ساخته شود
+    def needs_rehash(self, hashed):
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+hasher = PasswordHasher()
+
+
+def init_app(app):
+    hasher.configure(app.config.get('BCRYPT_ROUNDS', 12), app.config.get('BCRYPT_POOL_SIZE', 4))
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import jsonify, render_template, request
+
+# اسکریپت اتمی token bucket روی Redis: KEYS[1]، ARGV = ظرفیت، نرخ پر شدن در ثانیه، زمان فعلی
+REDIS_TOKEN_BUCKET = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = math.min(capacity, (tonumber(bucket[1]) or capacity) + (now - (tonumber(bucket[2]) or now)) * rate)
+local allowed = tokens >= 1
+if allowed then tokens = tokens - 1 end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+if allowed then return 0 end
+return math.ceil((1 - tokens) / rate * 1000)
+"""
+
+
+# token bucket داخل همین پردازه؛ bucketها به ترتیب آخرین استفاده نگه داشته می‌شوند و
+# هنگام رسیدن به max_keys قدیمی‌ترین‌ها دور ریخته می‌شوند تا bucket کلاینت‌های فعال پاک نشود
+class MemoryBuckets:
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (توکن‌ها، زمان به‌روزرسانی)
+
+    # خروجی: صفر یعنی مجاز، در غیر این صورت چند ثانیه تا توکن بعدی
+    def take(self, key, capacity, rate):
+        now = time.monotonic()
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                tokens = min(capacity, tokens + (now - updated) * rate)
+                self._buckets.move_to_end(key)
+            else:
+                while len(self._buckets) >= self.max_keys:
+                    self._buckets.popitem(last=False)
+                tokens = capacity
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# bucketهای مشترک بین workerها روی Redis؛ پکیج redis فقط در این حالت لازم است
+class RedisBuckets:
+    def __init__(self, url, prefix='ratelimit:'):
+        import redis
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(REDIS_TOKEN_BUCKET)
+
+    def take(self, key, capacity, rate):
+        wait_ms = self._script(keys=[self.prefix + key], args=[capacity, rate, time.time()])
+        return int(wait_ms) / 1000
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + '*'):
+            self._client.delete(key)
+
+
+# قانون «count/seconds»: ظرفیت count و پر شدن count توکن در هر seconds ثانیه
+def parse_rule(rule):
+    count, seconds = rule.split('/')
+    return int(count), int(count) / float(seconds)
+
+
+class RateLimiter:
+    def __init__(self):
+        self.backend = None
+        self.rules = {}  # endpoint -> [(نام کلید، تابع استخراج مقدار، ظرفیت، نرخ)]
+
+    def limit(self, endpoint, name, extract, rule):
+        capacity, rate = parse_rule(rule)
+        self.rules.setdefault(endpoint, []).append((name, extract, capacity, rate))
+
+    # قبل از اجرای view: بدون هیچ کوئری یا bcrypt.
+    # با اولین قانونی که رد کند متوقف می‌شود تا درخواست ردشده از bucket قانون‌های بعدی توکن کم نکند
+    def check(self):
+        if self.backend is None or request.method != 'POST':
+            return None
+        wait = 0
+        for name, extract, capacity, rate in self.rules.get(request.endpoint, ()):
+            value = extract()
+            if value:
+                wait = self.backend.take(f'{request.endpoint}:{name}:{value}', capacity, rate)
+                if wait:
+                    break
+        if not wait:
+            return None
+        retry_after = str(max(1, round(wait)))
+        if request.is_json:
+            response = jsonify(error='too many requests')
+        else:
+            response = render_template('rate_limited.html', retry_after=retry_after)
+        return response, 429, {'Retry-After': retry_after}
+
+
+limiter = RateLimiter()
+
+
+def _client_ip():
+    return request.remote_addr
+
+
+def _phone_number():
+    return ''.join(request.form.get('phone_number', '').split())
+
+
+def init_app(app):
+    backend = app.config.get('RATE_LIMIT_BACKEND', 'memory')
+    if backend == 'memory':
+        limiter.backend = MemoryBuckets()
+    elif backend == 'redis':
+        limiter.backend = RedisBuckets(app.config['RATE_LIMIT_URL'])
+    else:
+        limiter.backend = None
+    limiter.rules = {}
+    limiter.limit('book', 'ip', _client_ip, app.config.get('RATE_LIMIT_BOOK_IP', '20/60'))
+    limiter.limit('book', 'phone', _phone_number, app.config.get('RATE_LIMIT_BOOK_PHONE', '5/60'))
+    limiter.limit('login', 'ip', _client_ip, app.config.get('RATE_LIMIT_LOGIN_IP', '10/60'))
+    limiter.limit('register', 'ip', _client_ip, app.config.get('RATE_LIMIT_REGISTER_IP', '5/60'))
+    app.before_request(limiter.check)
@@ -0,0 +1,114 @@
+import threading
+import time as clock
+from datetime import datetime, time, timedelta
+
+import counters
+from models import Consultant
+
+# ترتیب روزها مطابق datetime.weekday() (دوشنبه = 0)
+WEEKDAYS = ['دوشنبه', 'سه‌شنبه', 'چهارشنبه', 'پنج‌شنبه', 'جمعه', 'شنبه', 'یکشنبه']
+
+
+# برنامه کاری یک مشاور با روزهای کاری به صورت bitmask و ساعت‌های parse شده
+class ConsultantSchedule:
+    __slots__ = ('id', 'name', 'specialty', 'days', 'day_mask', 'time_start', 'time_end', 'slot_length')
+
+    def __init__(self, consultant):
+        self.id = consultant.id
+        self.name = consultant.name
+        self.specialty = consultant.specialty
+        self.days = consultant.days
+        self.day_mask = 0
+        for day in consultant.days.split(','):
+            if day in WEEKDAYS:
+                self.day_mask |= 1 << WEEKDAYS.index(day)
+        self.time_start = time.fromisoformat(consultant.time_start)
+        self.time_end = time.fromisoformat(consultant.time_end)
+        self.slot_length = timedelta(minutes=consultant.slot_minutes or 30)
+
+    def works_on(self, weekday):
+        return bool(self.day_mask & (1 << weekday))
+
+    def within_hours(self, moment):
+        return self.time_start <= moment <= self.time_end
+
+    # شروع اسلات‌های یک روز: از time_start با گام slot_length تا جایی که اسلات کامل جا شود
+    def slots_on(self, day):
+        if not self.works_on(day.weekday()):
+            return
+        slot = datetime.combine(day, self.time_start)
+        end = datetime.combine(day, self.time_end)
+        while slot + self.slot_length <= end:
+            yield slot
+            slot += self.slot_length
+
+    def is_slot_start(self, moment):
+        if not self.works_on(moment.weekday()):
+            return False
+        offset = moment - datetime.combine(moment.date(), self.time_start)
+        return (offset >= timedelta(0) and offset % self.slot_length == timedelta(0)
+                and moment + self.slot_length <= datetime.combine(moment.date(), self.time_end))
+
+
+# کش درون‌پردازه‌ای برنامه مشاورها؛ هر ttl ثانیه نسخه جدول consultants
+# از جدول counters چک می‌شود تا workerهای دیگر هم تغییرات را ببینند
+class ScheduleCache:
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_name = {}
+        self._version = None
+        self._checked_at = 0.0
+
+    # min_version: نسخه‌ای که داده کش حداقل باید داشته باشد؛ اگر عقب‌تر است TTL نادیده گرفته می‌شود
+    def _fresh(self, min_version):
+        if self._version is None or (min_version is not None and self._version < min_version):
+            return False
+        return min_version is not None or clock.monotonic() - self._checked_at < self.ttl
+
+    def _refresh(self, min_version=None):
+        if self._fresh(min_version):
+            return
+        with self._lock:
+            if self._fresh(min_version):
+                return
+            version = counters.get('consultants')['consultants']
+            if version != self._version:
+                by_id, by_name = {}, {}
+                for consultant in Consultant.query.filter_by(deleted_at=None).order_by(Consultant.id):
+                    schedule = ConsultantSchedule(consultant)
+                    by_id[schedule.id] = schedule
+                    by_name.setdefault(schedule.name, schedule)
+                self._by_id, self._by_name = by_id, by_name
+                self._version = version
+            self._checked_at = clock.monotonic()
+
+    # کلید کش صفحه و ETag باید از نسخه داده‌ای ساخته شود که واقعاً رندر می‌شود، نه فقط از شمارنده دیتابیس؛
+    # داده عقب‌تر از version همین حالا تازه می‌شود و نسخه داده کش برمی‌گردد
+    def sync(self, version):
+        self._refresh(min_version=version)
+        return self._version
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+    def all(self):
+        self._refresh()
+        return list(self._by_id.values())
+
+    def get(self, consultant_id):
+        self._refresh()
+        return self._by_id.get(consultant_id)
+
+    def by_name(self, name):
+        self._refresh()
+        return self._by_name.get(name)
+
+
+schedules = ScheduleCache()
+
+
+def init_app(app):
+    schedules.ttl = app.config.get('SCHEDULE_CACHE_TTL', 30)
@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# پروفایل testing روی یک فایل SQLite موقت تا چند thread و اتصال واقعی داشته باشیم
+os.environ['APP_CONFIG'] = 'testing'
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app  # noqa: E402
+from models import db, User, Consultant  # noqa: E402
+from numbering import appointment_numbers  # noqa: E402
+from page_cache import pages  # noqa: E402
+from passwords import hasher  # noqa: E402
+from schedule_cache import schedules, WEEKDAYS  # noqa: E402
+from user_cache import users  # noqa: E402
+
+PASSWORD = 'test-password'
+
+
+# دیتابیس خالی با یک ادمین و یک مشاور که هر روز و هر ساعت کار می‌کند
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add_all([
+            User(username='admin', password=hasher.hash(PASSWORD), is_admin=True),
+            Consultant(name='consultant', specialty='general', days=','.join(WEEKDAYS),
+                       time_start='00:00', time_end='23:59'),
+        ])
+        db.session.commit()
+        schedules.invalidate()
+        users.clear()
+        pages.clear()
+        appointment_numbers.reset()
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def admin(app):
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': PASSWORD})
+    return client
+
+
+# داده فرم رزرو برای اسلات slot؛ فیلدهای دیگر با overrides عوض می‌شوند
+@pytest.fixture
+def booking_form():
+    def build(slot, **overrides):
+        form = {
+            'name': 'patient', 'phone_number': '09120000000', 'national_id': '0012345678', 'age': '30',
+            'education': 'کارشناسی', 'consultant': 'consultant', 'date': slot.strftime('%Y-%m-%dT%H:%M'),
+        }
+        form.update(overrides)
+        return form
+    return build
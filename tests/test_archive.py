@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import archive
+from models import db, Appointment, ArchivedAppointment
+
+
+def add_appointment(app, starts_at, number):
+    with app.app_context():
+        db.session.execute(db.insert(Appointment), [{
+            'name': f'patient {number}', 'phone_number': '09120000000', 'age': 30, 'education': 'کارشناسی',
+            'national_id': f'{number:010d}', 'consultant_id': 1, 'starts_at': starts_at, 'slot_start': starts_at,
+            'appointment_number': str(number),
+        }])
+        db.session.commit()
+
+
+def archived_numbers(app):
+    with app.app_context():
+        return db.session.scalars(db.select(ArchivedAppointment.appointment_number)).all()
+
+
+@pytest.mark.parametrize('days', ['0', '-5'])
+def test_cli_rejects_non_positive_days(app, days):
+    add_appointment(app, datetime.now() + timedelta(days=1), 10001)
+    result = app.test_cli_runner().invoke(args=['appointments', 'archive', '--older-than-days', days])
+    assert result.exit_code == 2
+    assert archived_numbers(app) == []
+
+
+def test_cli_rejects_non_positive_config(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'ARCHIVE_AFTER_DAYS', 0)
+    result = app.test_cli_runner().invoke(args=['appointments', 'archive'])
+    assert result.exit_code == 1
+    assert 'ARCHIVE_AFTER_DAYS' in result.output
+
+
+def test_archive_batch_refuses_future_cutoff(app):
+    add_appointment(app, datetime.now() + timedelta(days=1), 10001)
+    with app.app_context():
+        with pytest.raises(ValueError):
+            archive.archive_batch(datetime.now() + timedelta(days=2), 100)
+    assert archived_numbers(app) == []
+
+
+def test_cli_archives_only_old_appointments(app):
+    add_appointment(app, datetime.now() - timedelta(days=10), 10001)
+    add_appointment(app, datetime.now() + timedelta(days=1), 10002)
+    result = app.test_cli_runner().invoke(args=['appointments', 'archive', '--older-than-days', '1'])
+    assert result.exit_code == 0, result.output
+    assert archived_numbers(app) == ['10001']
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from models import db, Appointment
+
+SLOT = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time()) + timedelta(hours=9)
+KEY = '6f1c2a9e-0d4b-4c7e-9a51-3b8e2f70c1d4'
+
+
+def booked_numbers(app):
+    with app.app_context():
+        return db.session.scalars(db.select(Appointment.appointment_number)).all()
+
+
+def test_resubmitting_the_same_form_returns_the_original_number(app, booking_form):
+    client = app.test_client()
+    first = client.post('/book', data=booking_form(SLOT, idempotency_key=KEY)).get_data(as_text=True)
+    second = client.post('/book', data=booking_form(SLOT, idempotency_key=KEY)).get_data(as_text=True)
+
+    numbers = booked_numbers(app)
+    assert len(numbers) == 1
+    assert numbers[0] in first and numbers[0] in second
+    assert 'alert-success' in second
+
+
+def test_reused_key_with_different_booking_is_rejected(app, booking_form):
+    client = app.test_client()
+    client.post('/book', data=booking_form(SLOT, idempotency_key=KEY))
+    other_slot = client.post('/book', data=booking_form(SLOT + timedelta(minutes=30), idempotency_key=KEY))
+
+    numbers = booked_numbers(app)
+    assert len(numbers) == 1
+    assert numbers[0] not in other_slot.get_data(as_text=True)
+    assert 'alert-success' not in other_slot.get_data(as_text=True)
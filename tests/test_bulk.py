@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Appointment
+
+FIRST_SLOT = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+
+
+# n نوبت فعال پشت سر هم برای مشاور ۱؛ idها برمی‌گردد
+def add_appointments(app, n, start=0, **values):
+    with app.app_context():
+        rows = [{
+            'name': f'patient {i}', 'phone_number': f'0912{i:07d}', 'age': 30, 'education': 'کارشناسی',
+            'national_id': f'{i:010d}', 'consultant_id': 1, 'starts_at': FIRST_SLOT + timedelta(minutes=30 * i),
+            'slot_start': FIRST_SLOT + timedelta(minutes=30 * i), 'appointment_number': str(10000 + i), **values,
+        } for i in range(start, start + n)]
+        db.session.execute(db.insert(Appointment), rows)
+        db.session.commit()
+        return db.session.scalars(db.select(Appointment.id).where(Appointment.name.in_([row['name'] for row in rows]))
+                                  .order_by(Appointment.id)).all()
+
+
+@pytest.mark.parametrize('action', ['confirm', 'cancel'])
+def test_bulk_statement_count_does_not_depend_on_number_of_ids(app, admin, action):
+    warmup = add_appointments(app, 1)
+    small = add_appointments(app, 3, start=1)
+    large = add_appointments(app, 40, start=4)
+    # بار اول ردیف شمارنده‌ها ساخته و کاربر در کش ورود گذاشته می‌شود
+    admin.post('/admin/appointments/bulk', json={'action': action, 'ids': warmup})
+
+    counts = []
+    for ids in (small, large):
+        response = admin.post('/admin/appointments/bulk', json={'action': action, 'ids': ids})
+        assert response.status_code == 200
+        assert response.json['affected'] == len(ids)
+        counts.append(int(response.headers['X-Query-Count']))
+    assert counts[0] == counts[1]
+
+
+def test_bulk_filter_applies_the_same_filters_as_the_admin_panel(app, admin):
+    add_appointments(app, 1, confirmed=True)
+    add_appointments(app, 5, start=1)
+    query = {'consultant_id': '1', 'confirmed': '1'}
+
+    listed = admin.get('/admin_panel', query_string=query).get_data(as_text=True).count('name="ids"')
+    response = admin.post('/admin/appointments/bulk', json={'action': 'cancel', **query})
+    assert listed == 1
+    assert response.json['affected'] == 1
+    with app.app_context():
+        assert db.session.scalar(db.select(db.func.count()).where(Appointment.status == 'active')) == 5
+
+
+def test_bulk_filter_applies_the_admin_panel_search(app, admin):
+    add_appointments(app, 4)
+    query = {'consultant_id': '1', 'field': 'national_id', 'q': f'{2:010d}'}
+
+    response = admin.post('/admin/appointments/bulk', json={'action': 'confirm', **query})
+    assert response.json['affected'] == 1
+    with app.app_context():
+        assert db.session.scalars(db.select(Appointment.national_id).where(Appointment.confirmed)).all() == [query['q']]
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+from models import db, Consultant
+from schedule_cache import WEEKDAYS
+
+SLOT = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time()) + timedelta(hours=10, minutes=30)
+
+
+def edit_form(**overrides):
+    form = {'name': 'consultant', 'specialty': 'general', 'time_start': '00:00', 'time_end': '23:59',
+            'slot_minutes': '30', 'days': WEEKDAYS}
+    form.update(overrides)
+    return form
+
+
+def test_slot_grid_cannot_change_under_future_bookings(app, admin, booking_form):
+    assert 'alert-success' in admin.post('/book', data=booking_form(SLOT)).get_data(as_text=True)
+
+    admin.post('/admin/edit_consultant/1', data=edit_form(slot_minutes='60'))
+    with app.app_context():
+        assert db.session.get(Consultant, 1).slot_minutes == 30
+
+
+def test_other_fields_can_change_under_future_bookings(app, admin, booking_form):
+    admin.post('/book', data=booking_form(SLOT))
+    admin.post('/admin/edit_consultant/1', data=edit_form(specialty='family', time_end='22:00'))
+    with app.app_context():
+        consultant = db.session.get(Consultant, 1)
+        assert (consultant.specialty, consultant.time_end) == ('family', '22:00')
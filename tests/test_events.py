@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import events
+from models import Appointment
+
+TODAY_SLOT = datetime.combine(datetime.now().date(), datetime.min.time()) + timedelta(hours=23)
+LATER_SLOT = TODAY_SLOT + timedelta(days=2)
+
+
+def read_event(response):
+    for chunk in response.response:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith('id:'):
+            return chunk
+
+
+def test_public_stream_gets_only_todays_bookings_with_page_fields(app, admin, booking_form):
+    public = app.test_client().get('/events/appointments', buffered=False)
+    staff = admin.get('/events/appointments', buffered=False)
+    client = app.test_client()
+    client.post('/book', data=booking_form(LATER_SLOT))
+    client.post('/book', data=booking_form(TODAY_SLOT, national_id='0012345679'))
+
+    public_event = read_event(public)
+    assert '"starts_at": "%s"' % TODAY_SLOT.strftime('%Y-%m-%dT%H:%M') in public_event
+    assert 'national_id' not in public_event and 'age' not in public_event
+    assert LATER_SLOT.strftime('%Y-%m-%dT%H:%M') in read_event(staff)
+    public.close()
+    staff.close()
+
+
+def test_streams_beyond_the_cap_get_503(app):
+    client = app.test_client()
+    events.broker.max_subscribers = 2
+    streams = []
+    try:
+        streams += [client.get('/events/appointments', buffered=False) for _ in range(2)]
+        assert client.get('/events/appointments').status_code == 503
+        streams.pop().close()
+        streams.append(client.get('/events/appointments', buffered=False))
+        assert streams[-1].status_code == 200
+    finally:
+        for stream in streams:
+            stream.close()
+        events.broker.max_subscribers = app.config['EVENTS_MAX_SUBSCRIBERS']
+
+
+# رویدادی که بین گرفتن شناسه و اجرای کوئری صفحه منتشر شود باید بعد از باز شدن stream دوباره برسد،
+# پس شناسه داخل صفحه باید شناسه قبل از کوئری باشد
+@pytest.mark.parametrize('url, query', [('/today_appointments', 'between'), ('/admin_panel', 'listing')])
+def test_page_embeds_event_id_taken_before_its_query(app, admin, monkeypatch, url, query):
+    before = events.broker.last_id()
+    original = getattr(Appointment, query)
+
+    def query_with_concurrent_event(*args, **kwargs):
+        events.broker.publish('cancelled', {'ids': []})
+        return original(*args, **kwargs)
+    monkeypatch.setattr(Appointment, query, query_with_concurrent_event)
+
+    page = admin.get(url).get_data(as_text=True)
+    assert f'last_event_id={before}"' in page
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Notification
+from notifications import FakeSender, OutboxWorker, Sender
+
+
+# یک ردیف outbox آماده ارسال؛ id آن برمی‌گردد
+def add_notification(app, key='booked:10001'):
+    with app.app_context():
+        notification = Notification(idempotency_key=key, kind='booked', appointment_id=1, recipient='09120000000',
+                                    message='test', next_attempt_at=datetime.now())
+        db.session.add(notification)
+        db.session.commit()
+        return notification.id
+
+
+def load(app, notification_id):
+    with app.app_context():
+        notification = db.session.get(Notification, notification_id)
+        db.session.expunge(notification)
+        return notification
+
+
+# ردیفی که منتظر retry است بلافاصله قابل برداشتن می‌شود
+def make_due(app, notification_id):
+    with app.app_context():
+        db.session.execute(db.update(Notification).where(Notification.id == notification_id)
+                           .values(next_attempt_at=datetime.now() - timedelta(seconds=1)))
+        db.session.commit()
+
+
+@pytest.fixture
+def worker_for():
+    workers = []
+
+    def build(sender, **options):
+        workers.append(OutboxWorker(sender, **options))
+        return workers[-1]
+    yield build
+    for worker in workers:
+        worker.shutdown()
+
+
+def test_sender_is_abstract():
+    with pytest.raises(TypeError):
+        Sender()
+
+
+def test_failed_sends_are_retried_with_backoff_until_sent(app, worker_for):
+    notification_id = add_notification(app)
+    sender = FakeSender(fail_times=2)
+    worker = worker_for(sender, max_attempts=5, backoff=30)
+
+    for attempts in (1, 2):
+        before = datetime.now()
+        with app.app_context():
+            assert worker.run_once() == 1
+        notification = load(app, notification_id)
+        assert notification.status == 'pending'
+        assert notification.attempts == attempts
+        assert notification.last_error == 'fake sender failure'
+        delay = timedelta(seconds=30 * 2 ** (attempts - 1))
+        assert before + delay <= notification.next_attempt_at <= datetime.now() + delay
+        # قبل از موعد retry دوباره برداشته نمی‌شود
+        with app.app_context():
+            assert worker.run_once() == 0
+        make_due(app, notification_id)
+
+    with app.app_context():
+        assert worker.run_once() == 1
+    notification = load(app, notification_id)
+    assert notification.status == 'sent'
+    assert notification.attempts == 3
+    assert notification.last_error is None
+    assert notification.sent_at is not None
+    assert sender.sent == {'booked:10001': ('09120000000', 'test')}
+
+
+def test_send_fails_permanently_after_max_attempts(app, worker_for):
+    notification_id = add_notification(app)
+    sender = FakeSender(fail_times=10)
+    worker = worker_for(sender, max_attempts=2, backoff=30)
+
+    with app.app_context():
+        worker.run_once()
+    make_due(app, notification_id)
+    with app.app_context():
+        assert worker.run_once() == 1
+    notification = load(app, notification_id)
+    assert notification.status == 'failed'
+    assert notification.attempts == 2
+    assert notification.sent_at is None
+    assert sender.sent == {}
+    # ردیف failed دیگر برداشته نمی‌شود
+    make_due(app, notification_id)
+    with app.app_context():
+        assert worker.run_once() == 0
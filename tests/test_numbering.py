@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numbering
+from models import db, Appointment
+from numbering import BlockAllocator
+
+
+def test_parallel_allocators_never_repeat_a_number(app):
+    # هر allocator نقش یک worker جداگانه را دارد و چند thread از هر کدام شماره می‌گیرند
+    allocators = [BlockAllocator('appointment_number', block_size=3) for _ in range(4)]
+    numbers, lock = [], threading.Lock()
+
+    def take(allocator):
+        with app.app_context():
+            for _ in range(25):
+                value = allocator.next()
+                with lock:
+                    numbers.append(value)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(take, [allocators[i % 4] for i in range(16)]))
+
+    assert len(numbers) == 16 * 25
+    assert len(set(numbers)) == len(numbers)
+
+
+def test_parallel_bookings_get_distinct_numbers(app, booking_form):
+    app.config['APPOINTMENT_NUMBER_BLOCK'] = 3
+    numbering.init_app(app)
+    first_slot = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+    barrier = threading.Barrier(8)
+
+    def book(worker):
+        client = app.test_client()
+        barrier.wait()
+        for i in range(10):
+            slot = first_slot + timedelta(days=worker, minutes=30 * i)
+            page = client.post('/book', data=booking_form(slot)).get_data(as_text=True)
+            assert 'alert-success' in page
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(book, range(8)))
+    finally:
+        app.config['APPOINTMENT_NUMBER_BLOCK'] = 100
+        numbering.init_app(app)
+
+    with app.app_context():
+        numbers = db.session.scalars(db.select(Appointment.appointment_number)).all()
+    assert len(numbers) == 80
+    assert len(set(numbers)) == 80
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import rate_limit
+from rate_limit import MemoryBuckets, limiter
+
+SLOT = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+
+
+# در پروفایل testing محدودیت خاموش است؛ اینجا با حافظه و قانون‌های کوچک روشن می‌شود
+@pytest.fixture
+def buckets(monkeypatch):
+    backend = MemoryBuckets()
+    monkeypatch.setattr(limiter, 'backend', backend)
+    monkeypatch.setattr(limiter, 'rules', {})
+    limiter.limit('book', 'ip', rate_limit._client_ip, '1/60')
+    limiter.limit('book', 'phone', rate_limit._phone_number, '5/60')
+    return backend
+
+
+def test_request_rejected_by_ip_does_not_charge_phone(app, buckets, booking_form):
+    client = app.test_client()
+    client.post('/book', data=booking_form(SLOT, phone_number='09120000001'))
+    response = client.post('/book', data=booking_form(SLOT + timedelta(hours=1), phone_number='09120000002'))
+    assert response.status_code == 429
+    assert response.headers['Retry-After']
+    assert 'book:phone:09120000001' in buckets._buckets
+    assert 'book:phone:09120000002' not in buckets._buckets
+
+
+def test_full_buckets_evict_least_recently_used():
+    buckets = MemoryBuckets(max_keys=3)
+    for key in ('a', 'b', 'c'):
+        buckets.take(key, 1, 1 / 60)
+    # a دوباره استفاده می‌شود و b قدیمی‌ترین می‌ماند
+    assert buckets.take('a', 1, 1 / 60) > 0
+    buckets.take('d', 1, 1 / 60)
+    assert list(buckets._buckets) == ['c', 'a', 'd']
+    # bucket خالی a بعد از جا باز کردن برای d هم حفظ شده است
+    assert buckets.take('a', 1, 1 / 60) > 0
@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+from sqlalchemy import event
+
+import instrumentation
+from models import db, User
+
+
+# نسخه سبک کاربر برای Flask-Login؛ فقط فیلدهایی که برنامه لازم دارد
+class CachedUser(UserMixin):
+    def __init__(self, id, username, is_admin):
+        self.id = id
+        self.username = username
+        self.is_admin = bool(is_admin)
+
+
+# کش LRU با TTL برای user_loader تا هر درخواست یک کوئری users نزند
+class UserCache:
+    def __init__(self, ttl=60, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                instrumentation.record_saved_query()
+                return entry[1]
+        row = db.session.execute(
+            db.select(User.id, User.username, User.is_admin).where(User.id == user_id)
+        ).first()
+        if row is None:
+            return None
+        user = CachedUser(*row)
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+users = UserCache()
+
+
+# هر تغییر یا حذف کاربر از طریق ORM کش همان کاربر را پاک می‌کند
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user(mapper, connection, target):
+    users.invalidate(target.id)
+
+
+def init_app(app):
+    users.ttl = app.config.get('USER_CACHE_TTL', 60)
+    users.max_size = app.config.get('USER_CACHE_SIZE', 1024)